@@ -0,0 +1,316 @@
+"""
+Render benchmark — where the time goes in generate.py.
+
+Runs N synthetic variations through each pipeline stage and reports p50/p95
+per stage, throughput and peak RSS, optionally saving everything to a JSON
+file so runs can be compared across commits. Fully offline: variations are
+generated, audio is synthesised with ffmpeg's sine source, cards carry the
+committed stand-in logo from reference/, and every output lands in a temp
+directory.
+
+Every combination of the list options is one run, executed in its own
+subprocess so launch cost and peak RSS are measured per configuration.
+Exits non-zero, without saving, if any run or any variation in it failed.
+
+Usage:
+    python benchmark.py                                    # 20 cards, default settings
+    python benchmark.py -n 100 --concurrency 1 4           # Serial vs pooled
+    python benchmark.py --backend playwright pillow        # Compare backends
+    python benchmark.py --render-mode reload patch         # Compare page render modes
+    python benchmark.py --video --preset draft final       # Add audio + encode stages
+    python benchmark.py -n 200 --output bench/$(git rev-parse --short HEAD).json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from generate import (
+    BACKENDS,
+    DEFAULT_BACKEND,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_ENCODERS,
+    render_pool,
+)
+from src.audio_index import AudioIndex, ffprobe_track, measure_loudness
+from src.encoder import DEFAULT_PRESET, VIDEO_PRESETS, encode_video, run_process
+from src.image_formats import DEFAULT_FORMAT, DEFAULT_QUALITY, IMAGE_FORMATS, ImageEncoder
+from src.renderer import DEFAULT_RENDER_MODE, RENDER_MODES, load_html, patch_card, screenshot
+from src.stats import StageStats
+from src.template import TIER_COLORS, build_html
+
+BASE_DIR = Path(__file__).parent
+
+# Committed, so runs don't depend on the real logo.png being present
+BENCH_LOGO = BASE_DIR / "reference" / "logo.png"
+
+DEFAULT_COUNT = 20
+DEFAULT_SEED = 0
+
+# Synthetic audio tracks for the video stages: (seconds, Hz)
+BENCH_TRACKS = [(8, 220), (12, 330), (15, 440)]
+
+_WORDS = (
+    "rank your screen time sleep steps focus reading water coffee gym streak "
+    "be honest most people won't post theirs send this to a friend who needs it "
+    "official tiers are here where do you land no way this is real"
+).split()
+_METRICS = ["Daily Screen Time", "Sleep Score", "Daily Steps", "Deep Work Hours", "Books This Year"]
+
+
+def synthetic_variations(count: int, seed: int = DEFAULT_SEED) -> list[dict]:
+    """Deterministic variations with realistic hook lengths and tier tables."""
+    rng = random.Random(seed)
+
+    def phrase(lo: int, hi: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi))).capitalize()
+
+    return [
+        {
+            "hook": phrase(5, 12),
+            "hook_sub": phrase(3, 8),
+            "metric": rng.choice(_METRICS),
+            "tiers": {name: f"{rng.randint(1, 12)} hrs" for name in TIER_COLORS},
+        }
+        for _ in range(count)
+    ]
+
+
+def peak_rss_mb() -> dict:
+    """Peak resident set size of this process and of its reaped children
+    (Chromium, ffmpeg), in MB. ru_maxrss is KB on Linux, bytes on macOS."""
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2**20, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 2**20, 1),
+    }
+
+
+# ── One run ───────────────────────────────────────────────────────────────
+
+async def synthesise_audio(audio_dir: Path):
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    for seconds, hz in BENCH_TRACKS:
+        code, _, stderr = await run_process([
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "lavfi", "-i", f"sine=frequency={hz}:duration={seconds}",
+            "-ac", "2", str(audio_dir / f"tone-{hz}.wav"),
+        ])
+        if code != 0:
+            raise RuntimeError(f"ffmpeg could not synthesise audio: {stderr[-300:]}")
+
+
+async def run_config(config: dict) -> dict:
+    """Push config["count"] synthetic variations through every stage of one
+    pipeline configuration and return its stage stats."""
+    variations = synthetic_variations(config["count"], config["seed"])
+    backend, mode = config["backend"], config["render_mode"]
+    stages = {name: StageStats(name) for name in (
+        "launch", "html_build", "set_content", "screenshot", "raster", "image_encode",
+        "ffprobe", "loudnorm", "audio_index", "frames", "ffmpeg_encode",
+    )}
+
+    async def card(page, v: dict) -> bytes:
+        if backend == "pillow":
+            with stages["raster"].timed():
+                return await pool.card(page, v)
+        if mode == "patch":
+            await pool.load_shell(page)
+            with stages["set_content"].timed():
+                await patch_card(page, v)
+        else:
+            with stages["html_build"].timed():
+                html = build_html(v)
+            with stages["set_content"].timed():
+                await load_html(page, html)
+        with stages["screenshot"].timed():
+            return await screenshot(page)
+
+    errors = []
+
+    def check(job, result):
+        if isinstance(result, Exception):
+            errors.append(repr(result))
+
+    async def image_job(page, v: dict):
+        png = await card(page, v)
+        with stages["image_encode"].timed():
+            await encoder.encode(png)
+
+    with tempfile.TemporaryDirectory(prefix="mcm-bench-") as tmp:
+        tmp = Path(tmp)
+
+        tracks = []
+        if config["video"]:
+            await synthesise_audio(tmp / "audio")
+            for audio_file in sorted((tmp / "audio").iterdir()):
+                with stages["ffprobe"].timed():
+                    await ffprobe_track(audio_file)
+                with stages["loudnorm"].timed():
+                    await measure_loudness(audio_file)
+            with stages["audio_index"].timed():
+                tracks = await AudioIndex(tmp / "audio", tmp / "cache").refresh(workers=config["encoders"])
+
+        start = time.perf_counter()
+        async with AsyncExitStack() as stack:
+            encoder = stack.enter_context(ImageEncoder(config["format"], config["quality"], config["encoders"]))
+            with stages["launch"].timed():
+                pool = await stack.enter_async_context(
+                    render_pool(backend, config["concurrency"], mode))
+
+            if not config["video"]:
+                await pool.run(variations, image_job, on_done=check)
+            else:
+                encode_slots = asyncio.Semaphore(config["encoders"])
+
+                async def video_job(page, job):
+                    i, v = job
+                    with stages["frames"].timed():
+                        before, after = await pool.frames(page, v)
+                    async with encode_slots:
+                        with stages["ffmpeg_encode"].timed():
+                            await encode_video(before, after, tracks[i % len(tracks)],
+                                               tmp / f"{i}.mp4", VIDEO_PRESETS[config["preset"]])
+
+                await pool.run(list(enumerate(variations)), video_job, on_done=check)
+        wall = time.perf_counter() - start
+
+    return {
+        "config": config,
+        "wall": round(wall, 3),
+        "throughput": round((len(variations) - len(errors)) / wall, 3),
+        "failed": len(errors),
+        "first_error": errors[0] if errors else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {name: s.as_dict() for name, s in stages.items() if s.count},
+    }
+
+
+# ── Orchestration ─────────────────────────────────────────────────────────
+
+def configs(args) -> list[dict]:
+    grid = itertools.product(
+        args.backend, args.render_mode, args.concurrency, args.format,
+        args.preset if args.video else [None],
+    )
+    runs = []
+    for backend, mode, concurrency, fmt, preset in grid:
+        if backend == "pillow" and mode != args.render_mode[0]:
+            continue  # render modes only apply to Chromium
+        runs.append({
+            "count": args.count,
+            "seed": args.seed,
+            "video": args.video,
+            "backend": backend,
+            "render_mode": mode,
+            "concurrency": concurrency,
+            "encoders": args.encoders,
+            "format": fmt,
+            "quality": args.quality,
+            "preset": preset,
+        })
+    return runs
+
+
+def run_in_subprocess(config: dict) -> dict:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--run", json.dumps(config)],
+        cwd=BASE_DIR, stdout=subprocess.PIPE, text=True,
+        env={**os.environ, "MCM_LOGO_FILE": str(BENCH_LOGO)},
+    )
+    if proc.returncode != 0:
+        return {"config": config, "error": f"exit code {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> str | None:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                          capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def label(config: dict) -> str:
+    parts = [config["backend"]]
+    if config["backend"] == "playwright":
+        parts.append(config["render_mode"])
+    parts += [f"c{config['concurrency']}", config["format"]]
+    if config["preset"]:
+        parts.append(config["preset"])
+    return "/".join(parts)
+
+
+def print_run(run: dict):
+    print(f"\n{label(run['config'])}")
+    if "error" in run:
+        print(f"  ✗ {run['error']}")
+        return
+    rss = run["peak_rss_mb"]
+    print(f"  {run['throughput']:.2f} variation(s)/s over {run['wall']:.1f}s — "
+          f"peak RSS {rss['self']:.0f}MB (+{rss['children']:.0f}MB children)")
+    if run["failed"]:
+        print(f"  ✗ {run['failed']} variation(s) failed, first: {run['first_error']}")
+    print(f"  {'stage':<14} {'n':>5} {'p50':>9} {'p95':>9}")
+    for name, s in run["stages"].items():
+        print(f"  {name:<14} {s['count']:>5} {s['p50'] * 1000:7.1f}ms {s['p95'] * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the mass-content-maker render pipeline")
+    parser.add_argument("--count", "-n", type=int, default=DEFAULT_COUNT,
+                        help=f"Synthetic variations per run (default: {DEFAULT_COUNT})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the synthetic variations")
+    parser.add_argument("--video", "-v", action="store_true", help="Benchmark the video pipeline instead of images")
+    parser.add_argument("--backend", "-b", nargs="+", choices=BACKENDS, default=[DEFAULT_BACKEND])
+    parser.add_argument("--render-mode", "-m", nargs="+", choices=RENDER_MODES, default=[DEFAULT_RENDER_MODE])
+    parser.add_argument("--concurrency", "-c", nargs="+", type=int, default=[DEFAULT_CONCURRENCY],
+                        help="Pages/processes per run; pass 1 for a serial baseline")
+    parser.add_argument("--format", nargs="+", choices=list(IMAGE_FORMATS), default=[DEFAULT_FORMAT])
+    parser.add_argument("--quality", "-q", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--preset", "-p", nargs="+", choices=list(VIDEO_PRESETS), default=[DEFAULT_PRESET])
+    parser.add_argument("--encoders", "-e", type=int, default=DEFAULT_ENCODERS)
+    parser.add_argument("--output", "-o", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--run", help=argparse.SUPPRESS)  # internal: one config, JSON result on stdout
+    args = parser.parse_args()
+
+    if args.run:
+        sys.stdout, result_out = sys.stderr, sys.stdout  # progress output must not corrupt the result
+        result = asyncio.run(run_config(json.loads(args.run)))
+        print(json.dumps(result), file=result_out)
+        return
+
+    runs = []
+    for config in configs(args):
+        runs.append(run_in_subprocess(config))
+        print_run(runs[-1])
+
+    broken = [run for run in runs if "error" in run or run["failed"]]
+    if broken:
+        print(f"\n✗ {len(broken)} of {len(runs)} run(s) had failures — not comparable, nothing saved")
+        sys.exit(1)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "commit": git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "runs": runs,
+            }, f, indent=2)
+        print(f"\nSaved {len(runs)} run(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
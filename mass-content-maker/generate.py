@@ -6,409 +6,758 @@ matching the viral Runify-style format, branded for Seneca Chat.
 Usage:
     python generate.py                          # Generate all images
     python generate.py --index 0                # Generate specific image(s)
+    python generate.py --concurrency 8          # Render 8 images in parallel
     python generate.py --list                   # List all variations
     python generate.py --video                  # Generate all videos
     python generate.py --video --index 0 1 2    # Generate specific videos
+    python generate.py --video --encoders 4     # Limit parallel ffmpeg encodes
+    python generate.py --video --preset draft   # Quick low-quality encode (draft/fast/final)
+    python generate.py --force                  # Re-render even if output is up to date
+    python generate.py --backend pillow         # Render without a browser (Pillow)
+    python generate.py --compare-backends -i 0  # Pixel-diff Pillow against Playwright
+    python generate.py --check-render           # Diff Pillow against reference/ images (no browser)
+    python generate.py --video --shard 2/4 --seed 7   # Render shard 2 of 4, reproducible audio
+    python generate.py --merge shard-*/output   # Combine shard outputs into output/
+    python generate.py --variations spec.json   # Expand a compact metric × hooks spec
+    python generate.py --render-mode patch      # Reuse one loaded card per page, patching text in place
+    python generate.py --bench-modes            # Time reload vs patch rendering
+    python generate.py --format jpeg -q 88      # Smaller uploads: jpeg or webp instead of png
+    python generate.py --size-report -b pillow  # Compare image format sizes
+    python generate.py --watch                  # Re-render on every save of variations/logo
+    python generate.py --check                  # Find text that overflows the card, without rendering
+    python generate.py --fit                    # Shrink overflowing text instead of skipping it
+
+Unchanged outputs are skipped: output/manifest.json records a hash of the
+inputs behind every rendered file.
+
+Renders run fully offline: put the static Inter TTFs (Inter-Regular, -SemiBold,
+-Bold, -ExtraBold, -Black) in fonts/ next to this script.
 """
 
-import json
+import os
 import asyncio
 import argparse
-import base64
-import random
-import subprocess
-import tempfile
+import io
+import sys
+import time
+from contextlib import asynccontextmanager
+from itertools import chain
 from pathlib import Path
 
 from playwright.async_api import async_playwright
 
+from src.audio_index import AudioIndex, pick_track, scan_audio
+from src.encoder import AUDIO_ENCODE, DEFAULT_PRESET, VIDEO_PRESETS, encode_video
+from src.image_formats import DEFAULT_FORMAT, DEFAULT_QUALITY, IMAGE_FORMATS, ImageEncoder, image_settings
+from src.render_cache import RenderManifest, file_identity, merge_shards, render_key
+from src.pillow_renderer import CardRenderer, RasterPool, pixel_diff
+from src.renderer import DEFAULT_RENDER_MODE, RENDER_MODES, PagePool
+from src.stats import StageStats
+from src.template import LOGO_FILE, get_template
+from src.text_fit import TextFit
+from src.variations import count_variations, default_source, iter_variations, parse_shard, select
+
 BASE_DIR = Path(__file__).parent
-VARIATIONS_FILE = BASE_DIR / "variations.json"
-LOGO_FILE = BASE_DIR / "logo.png"
+VARIATIONS_FILE = default_source(BASE_DIR)  # variations.jsonl if present, else variations.json
 AUDIO_DIR = BASE_DIR / "audio"
 OUTPUT_DIR = BASE_DIR / "output"
 VIDEO_DIR = BASE_DIR / "output" / "videos"
-
-
-def get_logo_base64() -> str:
-    """Read the logo file and return as a base64 data URI."""
-    logo_bytes = LOGO_FILE.read_bytes()
-    b64 = base64.b64encode(logo_bytes).decode()
-    return f"data:image/png;base64,{b64}"
-
-
-def build_html(variation: dict, hide_card: bool = False) -> str:
-    """Build the HTML for a single ranked-tier image.
-    If hide_card=True, the card content is invisible (for fade-in effect).
-    """
-    hook = variation["hook"]
-    hook_sub = variation["hook_sub"]
-    metric = variation["metric"]
-    tiers = variation["tiers"]
-
-    tier_colors = {
-        "Bronze": {"bg": "linear-gradient(135deg, #CD7F32, #8B4513)", "shadow": "#CD7F32"},
-        "Gold": {"bg": "linear-gradient(135deg, #FFD700, #B8860B)", "shadow": "#FFD700"},
-        "Emerald": {"bg": "linear-gradient(135deg, #50C878, #2E8B57)", "shadow": "#50C878"},
-        "Diamond": {"bg": "linear-gradient(135deg, #B9F2FF, #4169E1)", "shadow": "#4169E1"},
-        "Champion": {"bg": "linear-gradient(135deg, #FF4444, #8B0000)", "shadow": "#FF4444"},
-        "Iridescent": {"bg": "linear-gradient(135deg, #E0C3FC, #8EC5FC, #F5576C)", "shadow": "#E0C3FC"},
-    }
-
-    logo_uri = get_logo_base64()
-
-    card_visibility = "visibility: hidden;" if hide_card else ""
-
-    tier_rows = ""
-    for tier_name, tier_value in tiers.items():
-        colors = tier_colors[tier_name]
-        tier_rows += f"""
-        <div class="tier-row">
-            <div class="tier-left">
-                <div class="tier-icon" style="background: {colors['bg']}; box-shadow: 0 0 12px {colors['shadow']}44;"></div>
-                <span class="tier-name">{tier_name}</span>
-            </div>
-            <span class="tier-value">{tier_value}</span>
-        </div>
-        <div class="tier-divider"></div>
-        """
-
-    return f"""<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8">
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700;800;900&display=swap');
-
-    * {{
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-    }}
-
-    body {{
-        width: 1080px;
-        height: 1920px;
-        font-family: 'Inter', -apple-system, sans-serif;
-        background: #000;
-        display: flex;
-        flex-direction: column;
-    }}
-
-    .top-padding {{
-        height: 120px;
-        background: #000;
-        flex-shrink: 0;
-    }}
-
-    .hook-section {{
-        background: #f5f5f5;
-        padding: 60px 70px 40px;
-        text-align: center;
-    }}
-
-    .hook-text {{
-        font-size: 62px;
-        font-weight: 800;
-        color: #1a1a1a;
-        line-height: 1.2;
-        margin-bottom: 16px;
-    }}
-
-    .hook-sub {{
-        font-size: 38px;
-        font-weight: 400;
-        color: #555;
-        line-height: 1.3;
-    }}
-
-    .card-section {{
-        flex: 1;
-        background: #0a0a0a;
-        border-radius: 30px 30px 0 0;
-        padding: 50px 70px 40px;
-        display: flex;
-        flex-direction: column;
-    }}
-
-    .card-content {{
-        display: flex;
-        flex-direction: column;
-        flex: 1;
-        {card_visibility}
-    }}
-
-    .app-brand {{
-        text-align: center;
-        margin-bottom: 14px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 20px;
-    }}
-
-    .app-logo {{
-        width: 96px;
-        height: 96px;
-        object-fit: contain;
-        border-radius: 16px;
-    }}
-
-    .app-name {{
-        font-size: 64px;
-        font-weight: 600;
-        color: #ccc;
-        letter-spacing: 0.5px;
-    }}
-
-    .metric-name {{
-        text-align: center;
-        font-size: 72px;
-        font-weight: 900;
-        background: linear-gradient(90deg, #6366f1, #a855f7, #ec4899);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 30px;
-        margin-top: 10px;
-    }}
-
-    .tiers-container {{
-        flex: 1;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-evenly;
-    }}
-
-    .tier-row {{
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        padding: 14px 0;
-    }}
-
-    .tier-left {{
-        display: flex;
-        align-items: center;
-        gap: 28px;
-    }}
-
-    .tier-icon {{
-        width: 84px;
-        height: 84px;
-        border-radius: 50%;
-        flex-shrink: 0;
-    }}
-
-    .tier-name {{
-        font-size: 52px;
-        font-weight: 700;
-        color: #fff;
-    }}
-
-    .tier-value {{
-        font-size: 52px;
-        font-weight: 700;
-        color: #fff;
-    }}
-
-    .tier-divider {{
-        height: 1px;
-        background: #333;
-        margin: 2px 0;
-    }}
-
-    .bottom-padding {{
-        height: 160px;
-        background: #0a0a0a;
-        flex-shrink: 0;
-    }}
-</style>
-</head>
-<body>
-    <div class="top-padding"></div>
-    <div class="hook-section">
-        <div class="hook-text">{hook}</div>
-        <div class="hook-sub">{hook_sub}</div>
-    </div>
-    <div class="card-section">
-        <div class="card-content">
-            <div class="app-brand">
-                <img class="app-logo" src="{logo_uri}" alt="Seneca Chat">
-                <span class="app-name">Seneca Chat</span>
-            </div>
-            <div class="metric-name">{metric}</div>
-            <div class="tiers-container">
-                {tier_rows}
-            </div>
-        </div>
-    </div>
-    <div class="bottom-padding"></div>
-</body>
-</html>"""
-
-
-async def generate_images(indices: list[int] | None = None):
-    """Generate images for specified variations (or all if None)."""
-    with open(VARIATIONS_FILE) as f:
-        variations = json.load(f)
-
-    OUTPUT_DIR.mkdir(exist_ok=True)
-
-    if indices is None:
-        indices = list(range(len(variations)))
-
-    print(f"Generating {len(indices)} image(s)...")
+REFERENCE_DIR = BASE_DIR / "reference"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+AUDIO_CACHE_DIR = OUTPUT_DIR / "audio"
+
+# Parallel browser pages (or Pillow worker processes) for rendering
+DEFAULT_CONCURRENCY = 4
+
+# "playwright" renders the HTML template in Chromium; "pillow" draws the card directly
+BACKENDS = ["playwright", "pillow"]
+DEFAULT_BACKEND = "playwright"
+
+# Seconds between checks of the watched files in --watch mode
+WATCH_INTERVAL = 0.2
+
+# Cards rendered by --bench-modes / --size-report when no --index is given
+BENCH_SAMPLE = 40
+
+# compare_backends() fails if Pillow drifts further than this from Playwright:
+# mean absolute channel difference (0-255) and fraction of visibly changed pixels
+BACKEND_TOLERANCE = {"mean": 6.0, "changed": 0.05}
+
+# check_render() fails if a Pillow card drifts further than this from its
+# committed image in reference/ (same measures as BACKEND_TOLERANCE); the
+# slack absorbs anti-aliasing differences between FreeType builds
+REFERENCE_TOLERANCE = {"mean": 1.0, "changed": 0.005}
+
+# Parallel ffmpeg encodes for videos
+DEFAULT_ENCODERS = os.cpu_count() or 1
+
+
+def variation_slug(variation: dict) -> str:
+    """Filename-safe slug for a variation's metric."""
+    return variation["metric"].lower().replace(" ", "-").replace("/", "-")
+
+
+def manifest_file(shard: tuple[int, int] | None = None) -> Path:
+    """output/manifest.json, or a per-shard manifest so shards never share one."""
+    if shard is None:
+        return MANIFEST_FILE
+    k, n = shard
+    return OUTPUT_DIR / f"manifest-{k}-of-{n}.json"
+
+
+def image_key(
+    variation: dict,
+    backend: str = DEFAULT_BACKEND,
+    fmt: str = DEFAULT_FORMAT,
+    quality: int = DEFAULT_QUALITY,
+) -> str:
+    return render_key(
+        kind="image",
+        variation=variation,
+        template=get_template().fingerprint,
+        backend=backend,
+        encode=image_settings(fmt, quality),
+    )
+
+
+def video_key(
+    variation: dict,
+    audio_file: Path,
+    preset: str = DEFAULT_PRESET,
+    backend: str = DEFAULT_BACKEND,
+) -> str:
+    return render_key(
+        kind="video",
+        variation=variation,
+        template=get_template().fingerprint,
+        backend=backend,
+        audio=file_identity(audio_file),
+        audio_encode=AUDIO_ENCODE,
+        encode=VIDEO_PRESETS[preset],
+    )
+
+
+@asynccontextmanager
+async def render_pool(backend: str, size: int, mode: str = DEFAULT_RENDER_MODE):
+    """A PagePool (Chromium) or RasterPool (Pillow processes) of `size` workers.
+    Both expose run(), card() and frames(). `mode` picks how Chromium pages
+    load each variation (reload / patch); Pillow ignores it."""
+    if backend == "pillow":
+        async with RasterPool(size) as pool:
+            yield pool
+        return
 
     async with async_playwright() as p:
         browser = await p.chromium.launch()
-        page = await browser.new_page(viewport={"width": 1080, "height": 1920})
+        try:
+            async with PagePool(browser, size, mode) as pool:
+                yield pool
+        finally:
+            await browser.close()
+
+
+@asynccontextmanager
+async def open_pool(pool, backend: str, size: int, mode: str = DEFAULT_RENDER_MODE):
+    """Yield `pool` if the caller already holds an open one, else a fresh render_pool()."""
+    if pool is not None:
+        yield pool
+        return
+    async with render_pool(backend, size, mode) as pool:
+        yield pool
+
+
+async def generate_images(
+    indices: list[int] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    force: bool = False,
+    backend: str = DEFAULT_BACKEND,
+    shard: tuple[int, int] | None = None,
+    source: Path = VARIATIONS_FILE,
+    mode: str = DEFAULT_RENDER_MODE,
+    fmt: str = DEFAULT_FORMAT,
+    quality: int = DEFAULT_QUALITY,
+    encoders: int = DEFAULT_ENCODERS,
+    fit: bool = False,
+    pool=None,
+):
+    """Generate images for specified variations (or all if None).
+    Up to `concurrency` variations render at once, each on its own page
+    (or worker process with the pillow backend); `mode` is the page render
+    mode (reload / patch).
+    Each render is written as `fmt` (png / jpeg / webp) at `quality`,
+    encoded on `encoders` threads while the next cards render.
+    Images whose inputs are unchanged since the last run are skipped unless force=True.
+    With `shard` = (K, N), only the K-th of N disjoint slices is rendered.
+    Variations whose text overflows the card are skipped, or shrunk to fit
+    with fit=True.
+
+    Variations stream from `source` straight into the render pool, so memory
+    stays flat however many there are. Pass an open `pool` to reuse warm
+    renderers across calls.
+    """
+    OUTPUT_DIR.mkdir(exist_ok=True)
 
-        for i in indices:
-            variation = variations[i]
-            html = build_html(variation)
+    manifest = RenderManifest(manifest_file(shard), force=force)
+
+    def stale():
+        for i, variation in fitted(select(source, indices, shard), fit):
+            key = image_key(variation, backend, fmt, quality)
+            path = image_path(i, variation, fmt)
+            if not manifest.is_fresh(path, key):
+                yield i, variation, path, key
+
+    # Pull the first stale image before launching renderers, so a fully cached run stays instant
+    jobs = stale()
+    first = next(jobs, None)
+    if first is None:
+        print(manifest.summary())
+        print("All images up to date.")
+        return
 
-            await page.set_content(html, wait_until="networkidle")
-            # Wait for fonts to load
-            await page.wait_for_timeout(1000)
+    print(f"Generating images from {source.name} ({concurrency} in parallel, {backend}, {fmt})...")
+
+    failed = []
+
+    def report(job, result):
+        i, _, path, key = job
+        if isinstance(result, Exception):
+            failed.append(i)
+            print(f"  ✗ [{i:02d}] {result}")
+            return
+        path.write_bytes(result)
+        manifest.record(path, key, index=i)
+        print(f"  ✓ {path.name}")
+
+    async def render(page, job) -> bytes:
+        return await encoder.encode(await pool.card(page, job[1]))
+
+    try:
+        with ImageEncoder(fmt, quality, encoders) as encoder:
+            async with open_pool(pool, backend, concurrency, mode) as pool:
+                await pool.run(chain([first], jobs), render, on_done=report)
+    finally:
+        manifest.save()
+
+    print(manifest.summary())
+    if failed:
+        print(f"\n{len(failed)} image(s) failed: {' '.join(str(i) for i in sorted(failed))}")
+    print(f"\nDone! Images saved to {OUTPUT_DIR}/")
 
-            slug = variation["metric"].lower().replace(" ", "-").replace("/", "-")
-            filename = f"{i:02d}-{slug}.png"
-            filepath = OUTPUT_DIR / filename
 
-            await page.screenshot(path=str(filepath), type="png")
-            print(f"  ✓ {filename}")
+def fitted(variations, fit: bool = False):
+    """Drop (i, variation) pairs whose text overflows the card, or with
+    fit=True shrink their text first and only drop what still overflows.
+    Text that fits but runs long is reported and still rendered."""
+    text_fit = TextFit()
+    for i, variation in variations:
+        if fit:
+            variation, problems = text_fit.fit(variation)
+        else:
+            problems = text_fit.problems(variation)
+        if problems:
+            hint = "" if fit else " (--fit shrinks it)"
+            print(f"  ✗ [{i:02d}] text doesn't fit: {'; '.join(problems)}{hint}")
+            continue
+        for warning in text_fit.warnings(variation):
+            print(f"  ⚠ [{i:02d}] {warning}")
+        yield i, variation
+
+
+def check_variations(indices: list[int] | None = None, source: Path = VARIATIONS_FILE) -> bool:
+    """Report every variation whose text overflows the card, and those that
+    fit but wrap long. True if all fit."""
+    text_fit = TextFit()
+    start = time.perf_counter()
+    checked = 0
+    bad = []
+    long = 0
+    for i, variation in select(source, indices):
+        checked += 1
+        problems = text_fit.problems(variation)
+        warnings = text_fit.warnings(variation)
+        if warnings and not problems:
+            long += 1
+            print(f"  ⚠ [{i:02d}] {variation['metric']}: {'; '.join(warnings)}")
+        if problems:
+            bad.append(i)
+            print(f"  ✗ [{i:02d}] {variation['metric']}")
+            for problem in problems:
+                print(f"       {problem}")
+            fixed, remaining = text_fit.fit(variation)
+            if not remaining:
+                print(f"       --fit: scale {fixed['scale']}")
+    elapsed = time.perf_counter() - start
+    print(f"Checked {checked} variation(s) from {source.name} in {elapsed * 1000:.0f}ms: "
+          f"{len(bad)} overflow the card, {long} fit but run long")
+    return not bad
+
+
+def image_path(i: int, variation: dict, fmt: str = DEFAULT_FORMAT) -> Path:
+    return OUTPUT_DIR / f"{i:02d}-{variation_slug(variation)}{IMAGE_FORMATS[fmt]['ext']}"
+
+
+def video_path(i: int, variation: dict) -> Path:
+    return VIDEO_DIR / f"{i:02d}-{variation_slug(variation)}.mp4"
+
+
+async def generate_videos(
+    indices: list[int] | None = None,
+    force: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    encoders: int = DEFAULT_ENCODERS,
+    preset: str = DEFAULT_PRESET,
+    backend: str = DEFAULT_BACKEND,
+    shard: tuple[int, int] | None = None,
+    seed: int | None = None,
+    source: Path = VARIATIONS_FILE,
+    mode: str = DEFAULT_RENDER_MODE,
+    fit: bool = False,
+    pool=None,
+):
+    """Generate videos with fade-in effect and random audio.
+    `preset` picks the encode settings (draft / fast / final) and `backend`
+    the frame renderer (playwright / pillow), `mode` the page render mode
+    (reload / patch). With `shard` = (K, N), only the
+    K-th of N disjoint slices is rendered; `seed` makes each variation's
+    audio pick reproducible across runs and machines.
+
+    Rendering and encoding overlap: `concurrency` browser pages produce frame
+    pairs into a bounded queue, and `encoders` ffmpeg processes consume them.
+    Videos whose inputs are unchanged since the last run are skipped unless
+    force=True; a cached video keeps the audio track it was rendered with.
+    Text that overflows the card is skipped, or shrunk to fit with fit=True.
+    Variations stream from `source` as the renderers ask for them. Pass an
+    open `pool` to reuse warm renderers across calls.
+    """
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    VIDEO_DIR.mkdir(exist_ok=True)
 
-        await browser.close()
+    # Check for audio files, then bring the probed/pre-encoded index up to date
+    if not scan_audio(AUDIO_DIR):
+        print(f"⚠ No audio files found in {AUDIO_DIR}/")
+        print("  Add .mp3, .wav, or .m4a files there, then re-run.")
+        return
 
-    print(f"\nDone! Images saved to {OUTPUT_DIR}/")
+    tracks = await AudioIndex(AUDIO_DIR, AUDIO_CACHE_DIR).refresh(workers=encoders)
+    if not tracks:
+        print("⚠ No usable audio tracks (all failed to index)")
+        return
 
+    print(f"Found {len(tracks)} audio file(s)")
+
+    manifest = RenderManifest(manifest_file(shard), force=force)
+    tracks_by_name = {t["name"]: t for t in tracks}
+
+    def stale():
+        for i, variation in fitted(select(source, indices, shard), fit):
+            path = video_path(i, variation)
+            if seed is not None:
+                track = pick_track(tracks, i, seed)
+            else:
+                # Keep the previous pick so an unchanged video stays a cache hit
+                track = tracks_by_name.get(manifest.get(path).get("audio")) or pick_track(tracks, i)
+            key = video_key(variation, track["path"], preset, backend)
+            if not manifest.is_fresh(path, key):
+                yield i, variation, path, track, key
+
+    jobs = stale()
+    first = next(jobs, None)
+    if first is None:
+        print(manifest.summary())
+        print("All videos up to date.")
+        return
 
-def get_random_audio() -> Path | None:
-    """Pick a random audio file from the audio directory."""
-    if not AUDIO_DIR.exists():
-        return None
-    audio_files = list(AUDIO_DIR.glob("*.[mM][pP]3")) + list(AUDIO_DIR.glob("*.[wW][aA][vV]")) + list(AUDIO_DIR.glob("*.[mM]4[aA]")) + list(AUDIO_DIR.glob("*.[mM][pP]4"))
-    if not audio_files:
-        return None
-    return random.choice(audio_files)
+    print(f"Generating videos from {source.name} ({concurrency} renderer(s), {encoders} encoder(s), preset: {preset})...\n")
+
+    render_stats = StageStats("render")
+    encode_stats = StageStats("encode")
+    # Bounded so the browser can't race ahead of ffmpeg and pile up frames in memory
+    frames_queue = asyncio.Queue(maxsize=encoders * 2)
+
+    async def render(page, job):
+        with render_stats.timed():
+            frames = await pool.frames(page, job[1])
+        await frames_queue.put((job, frames))
+
+    def report_render(job, result):
+        if isinstance(result, Exception):
+            print(f"  ✗ [{job[0]:02d}] render error: {result}")
+
+    async def encode_worker():
+        while (item := await frames_queue.get()) is not None:
+            (i, _, output, track, key), (before_png, after_png) = item
+            try:
+                with encode_stats.timed():
+                    await encode_video(before_png, after_png, track, output, VIDEO_PRESETS[preset])
+            except Exception as e:
+                print(f"  ✗ {output.name} — {e}")
+                continue
+            manifest.record(output, key, index=i, audio=track["name"])
+            print(f"  ✓ {output.name}  ({track['duration']:.1f}s, audio: {track['name']})")
+
+    workers = [asyncio.create_task(encode_worker()) for _ in range(encoders)]
+    try:
+        async with open_pool(pool, backend, concurrency, mode) as pool:
+            await pool.run(chain([first], jobs), render, on_done=report_render)
+        for _ in workers:
+            await frames_queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        manifest.save()
+
+    print()
+    print(manifest.summary())
+    print(render_stats.summary())
+    print(encode_stats.summary())
+    print(f"\nDone! Videos saved to {VIDEO_DIR}/")
 
 
-async def generate_videos(indices: list[int] | None = None):
-    """Generate videos with fade-in effect and random audio."""
-    with open(VARIATIONS_FILE) as f:
-        variations = json.load(f)
+async def compare_backends(
+    indices: list[int] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    source: Path = VARIATIONS_FILE,
+) -> bool:
+    """Render variations with both backends and pixel-diff the results.
+    Returns False if any card drifts past BACKEND_TOLERANCE."""
+    variations = dict(select(source, indices))
+    indices = list(variations)
+
+    renders = {backend: {} for backend in BACKENDS}
+    for backend in BACKENDS:
+        async with render_pool(backend, concurrency) as pool:
+            async def render(page, i: int) -> bytes:
+                return await pool.card(page, variations[i])
+
+            def keep(i: int, result, backend=backend):
+                if isinstance(result, Exception):
+                    print(f"  ✗ [{i:02d}] {backend}: {result}")
+                else:
+                    renders[backend][i] = result
+
+            await pool.run(indices, render, on_done=keep)
+
+    print(f"{'#':>4}  {'mean Δ':>7}  {'changed':>8}")
+    ok = True
+    for i in indices:
+        if i not in renders["playwright"] or i not in renders["pillow"]:
+            ok = False
+            continue
+        diff = pixel_diff(renders["playwright"][i], renders["pillow"][i])
+        within = all(diff[k] <= BACKEND_TOLERANCE[k] for k in BACKEND_TOLERANCE)
+        ok &= within
+        print(f"  {i:02d}  {diff['mean']:7.2f}  {diff['changed']:7.1%}  {'✓' if within else '✗'}")
+
+    print(f"\n{'All within' if ok else 'Outside'} tolerance (mean ≤ {BACKEND_TOLERANCE['mean']}, "
+          f"changed ≤ {BACKEND_TOLERANCE['changed']:.0%})")
+    return ok
+
+
+def check_render(update: bool = False) -> bool:
+    """Render reference/variations.json with the Pillow backend (no browser)
+    and diff each card against the committed reference/card-N.png. Returns
+    False if any card is missing or drifts past REFERENCE_TOLERANCE.
+    update=True rewrites the images instead, after an intended change."""
+    renderer = CardRenderer(REFERENCE_DIR / "logo.png")
+    ok = True
+    for i, variation in select(REFERENCE_DIR / "variations.json"):
+        buffer = io.BytesIO()
+        renderer.render(variation).save(buffer, "PNG", optimize=True)
+        reference = REFERENCE_DIR / f"card-{i}.png"
+        if update:
+            reference.write_bytes(buffer.getvalue())
+            print(f"  ✓ [{i}] wrote {reference.name}")
+            continue
+        if not reference.exists():
+            print(f"  ✗ [{i}] {reference.name} missing — run with --update-reference")
+            ok = False
+            continue
+        diff = pixel_diff(reference.read_bytes(), buffer.getvalue())
+        within = all(diff[k] <= REFERENCE_TOLERANCE[k] for k in REFERENCE_TOLERANCE)
+        ok &= within
+        print(f"  {'✓' if within else '✗'} [{i}] mean Δ {diff['mean']:.2f}, {diff['changed']:.1%} changed")
+
+    if not update:
+        print(f"\n{'All within' if ok else 'Outside'} tolerance (mean ≤ {REFERENCE_TOLERANCE['mean']}, "
+              f"changed ≤ {REFERENCE_TOLERANCE['changed']:.1%})")
+    return ok
+
+
+def prune_removed(source: Path, videos: bool, shard: tuple[int, int] | None = None) -> list[str]:
+    """Delete the images (or videos) of variations no longer in `source`,
+    i.e. whose index/slug no longer matches any current variation."""
+    current = {f"{i:02d}-{variation_slug(v)}" for i, v in enumerate(iter_variations(source))}
+    manifest = RenderManifest(manifest_file(shard))
+    pruned = manifest.prune(lambda name: name.startswith("videos/") != videos or Path(name).stem in current)
+    if pruned:
+        manifest.save()
+    return pruned
+
+
+async def watch(video: bool = False, interval: float = WATCH_INTERVAL, **options):
+    """Keep the renderers warm and rebuild whenever the variation source or
+    the logo is saved. The manifest skips unchanged variations, so only added
+    or edited ones re-render; outputs of removed variations are pruned.
+    `options` are passed to generate_images / generate_videos."""
+    source = options.get("source", VARIATIONS_FILE)
+    backend = options.get("backend", DEFAULT_BACKEND)
+    concurrency = options.get("concurrency", DEFAULT_CONCURRENCY)
+    mode = options.get("mode", DEFAULT_RENDER_MODE)
+    generate = generate_videos if video else generate_images
+    watched = [source, LOGO_FILE]
+
+    def snapshot() -> dict:
+        return {p: p.stat().st_mtime_ns if p.exists() else None for p in watched}
+
+    async def changed(seen: dict) -> dict:
+        while (now := snapshot()) == seen:
+            await asyncio.sleep(interval)
+        # Editors often write in several steps; wait for the files to settle
+        while (settled := snapshot()) != now:
+            now = settled
+            await asyncio.sleep(interval)
+        return now
+
+    async def rebuild(pool):
+        start = time.perf_counter()
+        try:
+            for name in prune_removed(source, video, options.get("shard")):
+                print(f"  − {name}")
+            await generate(pool=pool, **options)
+        except (ValueError, KeyError) as e:
+            print(f"✗ {source.name}: {e!r} — fix it and save again")
+        options["force"] = False  # --force applies to the first pass only
+        print(f"\n[watch] Rebuilt in {time.perf_counter() - start:.2f}s — "
+              f"watching {', '.join(p.name for p in watched)} (Ctrl-C to stop)\n")
+
+    seen = snapshot()
+    while True:
+        async with render_pool(backend, concurrency, mode) as pool:
+            logo = seen[LOGO_FILE]
+            await rebuild(pool)
+            while (seen := await changed(seen))[LOGO_FILE] == logo:
+                await rebuild(pool)
+        # The logo is baked into the template and every warm page or worker;
+        # start them afresh so it is picked up.
+        get_template.cache_clear()
+        print(f"{LOGO_FILE.name} changed — restarting renderers")
+
+
+def merge_outputs(shard_dirs: list[Path], source: Path = VARIATIONS_FILE):
+    """Combine per-shard output directories into output/ and report coverage."""
+    total = count_variations(source)
 
     OUTPUT_DIR.mkdir(exist_ok=True)
-    VIDEO_DIR.mkdir(exist_ok=True)
+    merged = merge_shards(shard_dirs, OUTPUT_DIR, MANIFEST_FILE)
+
+    print(f"Merged {len(shard_dirs)} shard(s) into {OUTPUT_DIR}/")
+    for kind, is_video in (("image", False), ("video", True)):
+        rendered = {e["index"] for name, e in merged.entries.items() if name.startswith("videos/") == is_video}
+        if not rendered:
+            continue
+        missing = sorted(set(range(total)) - rendered)
+        print(f"  {kind}s: {len(rendered)}/{total}", end="")
+        if missing:
+            shown = " ".join(str(i) for i in missing[:10])
+            print(f" — {len(missing)} missing: {shown}{' …' if len(missing) > 10 else ''}", end="")
+        print()
 
-    if indices is None:
-        indices = list(range(len(variations)))
 
-    # Check for audio files
-    audio_files = []
-    if AUDIO_DIR.exists():
-        audio_files = list(AUDIO_DIR.glob("*.[mM][pP]3")) + list(AUDIO_DIR.glob("*.[wW][aA][vV]")) + list(AUDIO_DIR.glob("*.[mM]4[aA]")) + list(AUDIO_DIR.glob("*.[mM][pP]4"))
-    if not audio_files:
-        print(f"⚠ No audio files found in {AUDIO_DIR}/")
-        print("  Add .mp3, .wav, or .m4a files there, then re-run.")
+async def benchmark_render_modes(
+    indices: list[int] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    source: Path = VARIATIONS_FILE,
+):
+    """Time Chromium card renders in each render mode over the same variations,
+    and check that every mode matches the full-reload output."""
+    variations = dict(select(source, indices if indices is not None else range(BENCH_SAMPLE)))
+    print(f"Benchmarking {len(variations)} card(s) per mode ({concurrency} page(s))...\n")
+
+    renders = {}
+    for mode in RENDER_MODES:
+        stats = StageStats(mode)
+        renders[mode] = {}
+        async with render_pool("playwright", concurrency, mode) as pool:
+            async def render(page, i: int) -> bytes:
+                with stats.timed():
+                    return await pool.card(page, variations[i])
+
+            def keep(i: int, result, mode=mode):
+                if isinstance(result, Exception):
+                    print(f"  ✗ [{i:02d}] {mode}: {result}")
+                else:
+                    renders[mode][i] = result
+
+            await pool.run(variations, render, on_done=keep)
+        print(stats.summary())
+
+    baseline = renders[RENDER_MODES[0]]
+    for mode in RENDER_MODES[1:]:
+        diffs = [pixel_diff(baseline[i], png)["mean"] for i, png in renders[mode].items() if i in baseline]
+        if diffs:
+            print(f"\n{mode} vs {RENDER_MODES[0]}: max mean Δ {max(diffs):.3f} over {len(diffs)} card(s)")
+
+
+async def size_report(
+    indices: list[int] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    backend: str = DEFAULT_BACKEND,
+    quality: int = DEFAULT_QUALITY,
+    encoders: int = DEFAULT_ENCODERS,
+    source: Path = VARIATIONS_FILE,
+):
+    """Render sample cards once and compare every output format's size and encode time."""
+    variations = dict(select(source, indices if indices is not None else range(BENCH_SAMPLE)))
+    print(f"Encoding {len(variations)} card(s) in every format (quality {quality})...\n")
+
+    renders = {}
+    async with render_pool(backend, concurrency) as pool:
+        async def render(page, i: int) -> bytes:
+            return await pool.card(page, variations[i])
+
+        def keep(i: int, result):
+            if isinstance(result, Exception):
+                print(f"  ✗ [{i:02d}] {result}")
+            else:
+                renders[i] = result
+
+        await pool.run(variations, render, on_done=keep)
+    if not renders:
         return
 
-    print(f"Found {len(audio_files)} audio file(s)")
-    print(f"Generating {len(indices)} video(s)...\n")
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(viewport={"width": 1080, "height": 1920})
-
-        for i in indices:
-            variation = variations[i]
-            slug = variation["metric"].lower().replace(" ", "-").replace("/", "-")
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                tmpdir = Path(tmpdir)
-
-                # Generate "before" frame (card content hidden)
-                html_before = build_html(variation, hide_card=True)
-                await page.set_content(html_before, wait_until="networkidle")
-                await page.wait_for_timeout(500)
-                before_path = tmpdir / "before.png"
-                await page.screenshot(path=str(before_path), type="png")
-
-                # Generate "after" frame (full content)
-                html_after = build_html(variation, hide_card=False)
-                await page.set_content(html_after, wait_until="networkidle")
-                await page.wait_for_timeout(500)
-                after_path = tmpdir / "after.png"
-                await page.screenshot(path=str(after_path), type="png")
-
-                # Pick random audio and get its duration
-                audio_file = random.choice(audio_files)
-                duration_result = subprocess.run(
-                    ["ffprobe", "-v", "quiet", "-show_entries", "format=duration",
-                     "-of", "default=noprint_wrappers=1:nokey=1", str(audio_file)],
-                    capture_output=True, text=True,
-                )
-                audio_duration = float(duration_result.stdout.strip())
-
-                video_filename = f"{i:02d}-{slug}.mp4"
-                video_path = VIDEO_DIR / video_filename
-
-                ffmpeg_cmd = [
-                    "ffmpeg", "-y",
-                    # Input 1: "before" image as 0.5s video
-                    "-loop", "1", "-t", "1.0", "-i", str(before_path),
-                    # Input 2: "after" image for full audio duration
-                    "-loop", "1", "-t", str(audio_duration), "-i", str(after_path),
-                    # Input 3: audio
-                    "-i", str(audio_file),
-                    # Filter: crossfade before→after over 0.5s, audio fade-in/out
-                    "-filter_complex",
-                    f"[0:v][1:v]xfade=transition=fade:duration=1.0:offset=0,format=yuv420p[v];"
-                    f"[2:a]anull[a]",
-                    "-map", "[v]", "-map", "[a]",
-                    "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-                    "-c:a", "aac", "-b:a", "192k",
-                    "-t", str(audio_duration),
-                    str(video_path),
-                ]
-
-                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    print(f"  ✗ {video_filename} — ffmpeg error:")
-                    print(f"    {result.stderr[-300:]}")
-                else:
-                    print(f"  ✓ {video_filename}  ({audio_duration:.1f}s, audio: {audio_file.name})")
+    raw = sum(len(png) for png in renders.values()) / len(renders)
+    print(f"{'format':<8} {'avg size':>10} {'vs raw':>7} {'encode':>9}")
+    print(f"{'raw png':<8} {raw / 1024:8.0f}KB {1:7.0%} {'—':>9}")
+    with ImageEncoder(quality=quality, workers=encoders) as encoder:
+        for fmt in IMAGE_FORMATS:
+            results = await asyncio.gather(*(encoder.measure(png, fmt) for png in renders.values()))
+            size = sum(r[0] for r in results) / len(results)
+            seconds = sum(r[1] for r in results) / len(results)
+            print(f"{fmt:<8} {size / 1024:8.0f}KB {size / raw:7.0%} {seconds * 1000:7.0f}ms")
 
-        await browser.close()
 
-    print(f"\nDone! Videos saved to {VIDEO_DIR}/")
+def shard_arg(spec: str) -> tuple[int, int]:
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 
-def list_variations():
-    with open(VARIATIONS_FILE) as f:
-        variations = json.load(f)
-    print(f"Found {len(variations)} variations:\n")
-    for i, v in enumerate(variations):
+def list_variations(source: Path = VARIATIONS_FILE):
+    count = 0
+    for i, v in enumerate(iter_variations(source)):
         print(f"  [{i:2d}] {v['metric']}")
         print(f"       Hook: {v['hook']}")
         print()
+        count += 1
+    print(f"Found {count} variations in {source.name}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate ranked-tier social media images & videos")
     parser.add_argument("--index", "-i", type=int, nargs="+", help="Generate specific variation(s) by index")
     parser.add_argument("--list", "-l", action="store_true", help="List all variations")
+    parser.add_argument("--variations", type=Path, default=VARIATIONS_FILE, metavar="PATH",
+                        help=f"Variation source: .json array, .jsonl, or compact spec (default: {VARIATIONS_FILE.name})")
     parser.add_argument("--video", "-v", action="store_true", help="Generate videos instead of images")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Pages rendering in parallel (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--encoders", "-e", type=int, default=DEFAULT_ENCODERS,
+                        help=f"Parallel encodes: ffmpeg for videos, image format for images (default: {DEFAULT_ENCODERS})")
+    parser.add_argument("--format", choices=list(IMAGE_FORMATS), default=DEFAULT_FORMAT, dest="fmt",
+                        help=f"Image output format; Instagram only accepts jpeg (default: {DEFAULT_FORMAT})")
+    parser.add_argument("--quality", "-q", type=int, default=DEFAULT_QUALITY,
+                        help=f"jpeg/webp quality, 1-100 (default: {DEFAULT_QUALITY})")
+    parser.add_argument("--size-report", action="store_true",
+                        help=f"Compare output format sizes over --index (or the first {BENCH_SAMPLE}) and exit")
+    parser.add_argument("--preset", "-p", choices=list(VIDEO_PRESETS), default=DEFAULT_PRESET,
+                        help=f"Video encode preset (default: {DEFAULT_PRESET})")
+    parser.add_argument("--backend", "-b", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"Card renderer (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--render-mode", "-m", choices=RENDER_MODES, default=DEFAULT_RENDER_MODE,
+                        help="Chromium pages: reload the full HTML per variation, or patch a "
+                             f"persistent card in place (default: {DEFAULT_RENDER_MODE})")
+    parser.add_argument("--bench-modes", action="store_true",
+                        help=f"Time each render mode over --index (or the first {BENCH_SAMPLE}) and exit")
+    parser.add_argument("--compare-backends", action="store_true",
+                        help="Pixel-diff the pillow backend against playwright and exit")
+    parser.add_argument("--check-render", action="store_true",
+                        help="Diff pillow renders against the images in reference/ (no browser) and exit")
+    parser.add_argument("--update-reference", action="store_true",
+                        help="Re-render the images in reference/ after an intended change and exit")
+    parser.add_argument("--shard", type=shard_arg, metavar="K/N",
+                        help="Only render shard K of N (1-based), e.g. for a CI matrix")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible per-variation audio picks")
+    parser.add_argument("--merge", type=Path, nargs="+", metavar="DIR",
+                        help="Merge shard output directories into output/ and exit")
+    parser.add_argument("--watch", "-w", action="store_true",
+                        help="Stay running and re-render whatever changes when the variations or logo are saved")
+    parser.add_argument("--check", action="store_true",
+                        help="Check every variation's text fits the card, without rendering, and exit")
+    parser.add_argument("--fit", action="store_true",
+                        help="Shrink text that overflows the card instead of skipping the variation")
+    parser.add_argument("--force", "-f", action="store_true", help="Re-render even if cached output is up to date")
     args = parser.parse_args()
 
     if args.list:
-        list_variations()
+        list_variations(args.variations)
         return
 
+    if args.merge:
+        merge_outputs(args.merge, args.variations)
+        return
+
+    if args.check:
+        sys.exit(0 if check_variations(args.index, args.variations) else 1)
+
+    if args.check_render or args.update_reference:
+        sys.exit(0 if check_render(update=args.update_reference) else 1)
+
+    if not 1 <= args.quality <= 100:
+        parser.error("--quality must be between 1 and 100")
+
+    if args.size_report:
+        asyncio.run(size_report(
+            args.index,
+            concurrency=args.concurrency,
+            backend=args.backend,
+            quality=args.quality,
+            encoders=args.encoders,
+            source=args.variations,
+        ))
+        return
+
+    if args.bench_modes:
+        asyncio.run(benchmark_render_modes(args.index, concurrency=args.concurrency, source=args.variations))
+        return
+
+    if args.compare_backends:
+        ok = asyncio.run(compare_backends(args.index, concurrency=args.concurrency, source=args.variations))
+        sys.exit(0 if ok else 1)
+
+    options = dict(
+        force=args.force,
+        concurrency=args.concurrency,
+        encoders=args.encoders,
+        backend=args.backend,
+        shard=args.shard,
+        source=args.variations,
+        mode=args.render_mode,
+        fit=args.fit,
+    )
     if args.video:
-        asyncio.run(generate_videos(args.index))
+        options.update(preset=args.preset, seed=args.seed)
     else:
-        asyncio.run(generate_images(args.index))
+        options.update(fmt=args.fmt, quality=args.quality)
+
+    if args.watch:
+        try:
+            asyncio.run(watch(args.video, indices=args.index, **options))
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        return
+
+    generate = generate_videos if args.video else generate_images
+    asyncio.run(generate(args.index, **options))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,389 @@
+"""
+Render daemon — a warm card renderer that other tools can call.
+
+Keeps one browser (or Pillow worker pool) running and serves render and
+encode jobs over a small local JSON/HTTP API, on a TCP port bound to
+localhost or on a Unix socket. Outputs are content-addressed under
+output/daemon/, so a repeated request is answered from disk.
+
+Usage:
+    python render_daemon.py                         # http://127.0.0.1:8765
+    python render_daemon.py --socket /tmp/mcm.sock  # Unix socket instead
+    python render_daemon.py -b pillow -c 8          # Browserless, 8 workers
+
+API (JSON in, JSON out):
+    POST /render  {"variation": {...}, "format": "jpeg", "quality": 90, "output": "/abs/path.jpg"}
+    POST /video   {"variation": {...}, "preset": "fast", "audio": "track.mp3", "seed": 7}
+    GET  /stats   queue depth, in-flight jobs and per-stage latency (p50/p95)
+    GET  /health
+
+Both POST endpoints return {"path": ..., "key": ..., "cached": bool, "seconds": ...};
+"format", "quality", "preset", "audio", "seed" and "output" are optional.
+"output" must lie under output/. POSTs must be Content-Type: application/json
+and every request needs a localhost Host header, so a web page can't reach
+the API with a simple cross-origin form post or through DNS rebinding.
+src/render_client.py wraps this for other Python tools.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from generate import (
+    AUDIO_CACHE_DIR,
+    AUDIO_DIR,
+    BACKENDS,
+    DEFAULT_BACKEND,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_ENCODERS,
+    OUTPUT_DIR,
+    image_key,
+    render_pool,
+    video_key,
+)
+from src.audio_index import AudioIndex, pick_track, scan_audio
+from src.encoder import DEFAULT_PRESET, VIDEO_PRESETS, encode_video
+from src.image_formats import DEFAULT_FORMAT, DEFAULT_QUALITY, IMAGE_FORMATS, ImageEncoder
+from src.render_cache import render_key
+from src.render_client import DEFAULT_PORT
+from src.renderer import DEFAULT_RENDER_MODE, RENDER_MODES
+from src.stats import StageStats
+from src.template import TIER_COLORS
+
+DAEMON_DIR = OUTPUT_DIR / "daemon"
+
+# Jobs allowed to wait for a renderer before new ones are refused with 503
+DEFAULT_MAX_QUEUE = 256
+
+# Recent jobs kept per stage for the latency percentiles in /stats
+STATS_WINDOW = 1000
+
+MAX_BODY = 1 << 20
+
+# Host header values (port stripped) the API answers; anything else is a
+# browser that was pointed here by another site
+ALLOWED_HOSTS = {"127.0.0.1", "localhost"}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class Busy(RuntimeError):
+    pass
+
+
+class RenderDaemon:
+    """Turns render/video requests into files, `pool.size` at a time."""
+
+    def __init__(self, pool, encoder: ImageEncoder, tracks: list[dict], backend: str,
+                 encoders: int = DEFAULT_ENCODERS, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.pool = pool
+        self.encoder = encoder
+        self.tracks = tracks
+        self.backend = backend
+        self.max_queue = max_queue
+        self.started = time.time()
+        self.waiting = 0
+        self.running = 0
+        self.counts = {"served": 0, "cached": 0, "failed": 0, "refused": 0}
+        self.stages = {name: StageStats(name, window=STATS_WINDOW)
+                       for name in ("queue", "render", "frames", "encode")}
+        self._encode_slots = asyncio.Semaphore(max(1, encoders))
+
+    # ── Jobs ──────────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def _renderer(self):
+        """A free page/worker for one job; refuses work once the queue is full."""
+        if self.waiting >= self.max_queue:
+            self.counts["refused"] += 1
+            raise Busy(f"{self.waiting} job(s) already queued")
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        leased = False
+        try:
+            async with self.pool.lease() as handle:
+                self.waiting -= 1
+                leased = True
+                self.stages["queue"].record(time.perf_counter() - queued_at)
+                self.running += 1
+                try:
+                    yield handle
+                finally:
+                    self.running -= 1
+        finally:
+            if not leased:
+                self.waiting -= 1
+
+    @staticmethod
+    def _output(payload: dict, key: str, ext: str) -> Path:
+        if not payload.get("output"):
+            return DAEMON_DIR / f"{key[:24]}{ext}"
+        if not isinstance(payload["output"], str):
+            raise BadRequest("output must be a path string")
+        root = OUTPUT_DIR.resolve()
+        output = (root / payload["output"]).resolve()
+        if not output.is_relative_to(root) or output == root:
+            raise BadRequest(f"output must be a file under {OUTPUT_DIR}")
+        return output
+
+    async def render(self, payload: dict) -> dict:
+        variation = _variation(payload)
+        fmt = payload.get("format", DEFAULT_FORMAT)
+        quality = payload.get("quality", DEFAULT_QUALITY)
+        if fmt not in IMAGE_FORMATS:
+            raise BadRequest(f"format must be one of {list(IMAGE_FORMATS)}")
+        if not isinstance(quality, int) or not 1 <= quality <= 100:
+            raise BadRequest("quality must be an integer from 1 to 100")
+
+        key = image_key(variation, self.backend, fmt, quality)
+        output = self._output(payload, key, IMAGE_FORMATS[fmt]["ext"])
+        if output.exists() and not payload.get("output"):
+            self.counts["cached"] += 1
+            return {"path": str(output), "key": key, "cached": True, "seconds": 0.0}
+
+        start = time.perf_counter()
+        async with self._renderer() as handle:
+            with self.stages["render"].timed():
+                png = await self.pool.card(handle, variation)
+        _write(output, await self.encoder.encode(png, fmt, quality))
+        return {"path": str(output), "key": key, "cached": False,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    async def video(self, payload: dict) -> dict:
+        variation = _variation(payload)
+        preset = payload.get("preset", DEFAULT_PRESET)
+        if preset not in VIDEO_PRESETS:
+            raise BadRequest(f"preset must be one of {list(VIDEO_PRESETS)}")
+        if not self.tracks:
+            raise BadRequest(f"no audio tracks in {AUDIO_DIR}")
+        if payload.get("audio"):
+            track = next((t for t in self.tracks if t["name"] == payload["audio"]), None)
+            if track is None:
+                raise BadRequest(f"unknown audio track {payload['audio']!r}")
+        else:
+            # Keyed on the variation so identical requests pick the same track
+            # and hit the cache; "seed" reshuffles the choice
+            index = int(render_key(variation=variation)[:8], 16)
+            track = pick_track(self.tracks, index, payload.get("seed", 0))
+
+        key = video_key(variation, track["path"], preset, self.backend)
+        output = self._output(payload, key, ".mp4")
+        if output.exists() and not payload.get("output"):
+            self.counts["cached"] += 1
+            return {"path": str(output), "key": key, "cached": True, "seconds": 0.0}
+
+        start = time.perf_counter()
+        async with self._renderer() as handle:
+            with self.stages["frames"].timed():
+                before, after = await self.pool.frames(handle, variation)
+        async with self._encode_slots:
+            with self.stages["encode"].timed():
+                output.parent.mkdir(parents=True, exist_ok=True)
+                await encode_video(before, after, track, output, VIDEO_PRESETS[preset])
+        return {"path": str(output), "key": key, "cached": False, "audio": track["name"],
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "renderers": self.pool.size,
+            "uptime": round(time.time() - self.started, 1),
+            "queue_depth": self.waiting,
+            "running": self.running,
+            **self.counts,
+            "stages": {name: s.as_dict() for name, s in self.stages.items()},
+        }
+
+    # ── HTTP ──────────────────────────────────────────────────────────────
+
+    async def dispatch(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict]:
+        routes = {
+            ("GET", "/health"): None,
+            ("GET", "/stats"): None,
+            ("POST", "/render"): self.render,
+            ("POST", "/video"): self.video,
+        }
+        if headers.get("host", "").rsplit(":", 1)[0] not in ALLOWED_HOSTS:
+            return 403, {"error": "Host must be 127.0.0.1 or localhost"}
+        if (method, path) not in routes:
+            return 404, {"error": f"no route for {method} {path}"}
+        if method == "POST" and headers.get("content-type", "").split(";")[0].strip() != "application/json":
+            return 415, {"error": "Content-Type must be application/json"}
+        if path == "/health":
+            return 200, {"ok": True}
+        if path == "/stats":
+            return 200, self.stats()
+
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise BadRequest("body must be a JSON object")
+            result = await routes[(method, path)](payload)
+        except (BadRequest, json.JSONDecodeError) as e:
+            return 400, {"error": str(e)}
+        except Busy as e:
+            return 503, {"error": f"busy: {e}"}
+        except Exception as e:
+            self.counts["failed"] += 1
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        self.counts["served"] += 1
+        return 200, result
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One HTTP/1.1 request per connection."""
+        try:
+            try:
+                request = await _read_request(reader)
+            except BadRequest as e:
+                status, body = 400, {"error": str(e)}
+            else:
+                if request is None:
+                    return
+                status, body = await self.dispatch(*request)
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+            415: "Unsupported Media Type", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+def _variation(payload: dict) -> dict:
+    variation = payload.get("variation")
+    if not isinstance(variation, dict):
+        raise BadRequest("body needs a 'variation' object")
+    missing = [k for k in ("hook", "hook_sub", "metric", "tiers") if k not in variation]
+    if missing:
+        raise BadRequest(f"variation is missing {', '.join(missing)}")
+    wrong = [k for k in ("hook", "hook_sub", "metric") if not isinstance(variation[k], str)]
+    if wrong:
+        raise BadRequest(f"variation {', '.join(wrong)} must be string(s)")
+    tiers = variation["tiers"]
+    if not isinstance(tiers, dict) or not all(
+        isinstance(name, str) and isinstance(value, str) for name, value in tiers.items()
+    ):
+        raise BadRequest("variation tiers must map tier names to strings")
+    unknown = [name for name in tiers if name not in TIER_COLORS]
+    if unknown:
+        raise BadRequest(f"unknown tier(s) {', '.join(unknown)}; expected {', '.join(TIER_COLORS)}")
+    return variation
+
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readline()
+    except ValueError:  # longer than the stream's line limit
+        raise BadRequest("request line or header too long") from None
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, path, headers, body) of the next request, or None if the client hung up.
+    Raises BadRequest for anything that isn't a well-formed HTTP/1.x request."""
+    request_line = await _readline(reader)
+    if not request_line.strip():
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[1].startswith("/") or not parts[2].startswith("HTTP/1."):
+        raise BadRequest(f"malformed request line {request_line[:80]!r}")
+    method, target, _ = parts
+    headers = {}
+    while (line := await _readline(reader)) not in (b"\r\n", b"\n", b""):
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep:
+            raise BadRequest(f"malformed header {line[:80]!r}")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest(f"invalid Content-Length {headers['content-length']!r}") from None
+    if not 0 <= length <= MAX_BODY:
+        raise BadRequest(f"Content-Length must be between 0 and {MAX_BODY}")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+async def serve(
+    port: int = DEFAULT_PORT,
+    socket_path: Path | None = None,
+    backend: str = DEFAULT_BACKEND,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    encoders: int = DEFAULT_ENCODERS,
+    mode: str = DEFAULT_RENDER_MODE,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+):
+    tracks = []
+    if scan_audio(AUDIO_DIR):
+        tracks = await AudioIndex(AUDIO_DIR, AUDIO_CACHE_DIR).refresh(workers=encoders)
+
+    with ImageEncoder(workers=encoders) as encoder:
+        async with render_pool(backend, concurrency, mode) as pool:
+            daemon = RenderDaemon(pool, encoder, tracks, backend, encoders, max_queue)
+            if socket_path:
+                socket_path.unlink(missing_ok=True)
+                server = await asyncio.start_unix_server(daemon.handle, path=str(socket_path))
+                where = f"unix:{socket_path}"
+            else:
+                server = await asyncio.start_server(daemon.handle, "127.0.0.1", port)
+                where = f"http://127.0.0.1:{port}"
+            print(f"Render daemon ready on {where} ({backend}, {pool.size} renderer(s), "
+                  f"{len(tracks)} audio track(s))")
+            async with server:
+                await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve card renders and video encodes from a warm renderer")
+    parser.add_argument("--port", type=int, default=int(os.getenv("RENDER_DAEMON_PORT", DEFAULT_PORT)),
+                        help=f"Localhost TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", type=Path, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--backend", "-b", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--render-mode", "-m", choices=RENDER_MODES, default="patch",
+                        help="Chromium render mode; patch keeps one warm card per page (default: patch)")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Jobs rendering at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--encoders", "-e", type=int, default=DEFAULT_ENCODERS,
+                        help=f"Parallel image/ffmpeg encodes (default: {DEFAULT_ENCODERS})")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help=f"Waiting jobs before requests get 503 (default: {DEFAULT_MAX_QUEUE})")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            port=args.port,
+            socket_path=args.socket,
+            backend=args.backend,
+            concurrency=args.concurrency,
+            encoders=args.encoders,
+            mode=args.render_mode,
+            max_queue=args.max_queue,
+        ))
+    except KeyboardInterrupt:
+        print("\nRender daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Indexed audio library.
+
+Each track in audio/ is probed and pre-encoded to AAC once; the results live
+in output/audio/index.json keyed by file name, size and mtime. Videos then
+stream-copy the pre-encoded audio instead of probing and transcoding the
+same track for every render. Refreshing the index only touches tracks that
+were added or changed, and drops tracks that were removed.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from pathlib import Path
+
+from src.encoder import AUDIO_ENCODE, run_process
+from src.render_cache import file_identity
+
+AUDIO_PATTERNS = ["*.[mM][pP]3", "*.[wW][aA][vV]", "*.[mM]4[aA]", "*.[mM][pP]4"]
+
+
+def scan_audio(audio_dir: Path) -> list[Path]:
+    """All audio files in `audio_dir`, sorted by name."""
+    if not audio_dir.exists():
+        return []
+    files = {f for pattern in AUDIO_PATTERNS for f in audio_dir.glob(pattern)}
+    return sorted(files, key=lambda f: f.name)
+
+
+def pick_track(tracks: list[dict], index: int, seed: int | None = None) -> dict:
+    """Choose a track for variation `index`. With a seed the choice depends only
+    on (seed, index), so every machine and shard picks the same track."""
+    if seed is None:
+        return random.choice(tracks)
+    return random.Random(f"{seed}:{index}").choice(tracks)
+
+
+async def ffprobe_track(audio_file: Path) -> dict:
+    """Duration and sample rate of a track, from its container headers."""
+    _, stdout, _ = await run_process([
+        "ffprobe", "-v", "quiet", "-select_streams", "a:0",
+        "-show_entries", "format=duration:stream=sample_rate", "-of", "json",
+        str(audio_file),
+    ])
+    info = json.loads(stdout)
+    streams = info.get("streams") or [{}]
+    return {
+        "duration": float(info["format"]["duration"]),
+        "sample_rate": int(streams[0].get("sample_rate", 0)),
+    }
+
+
+async def measure_loudness(audio_file: Path) -> float | None:
+    """Integrated loudness (LUFS) of a track — a full decode pass through loudnorm."""
+    # loudnorm prints its measurements as a JSON block on stderr
+    _, _, stderr = await run_process([
+        "ffmpeg", "-hide_banner", "-nostats", "-i", str(audio_file),
+        "-af", "loudnorm=print_format=json", "-f", "null", "-",
+    ])
+    match = re.search(r"\{[^{}]*\"input_i\"[^{}]*\}", stderr)
+    return float(json.loads(match.group(0))["input_i"]) if match else None
+
+
+async def probe_track(audio_file: Path) -> dict:
+    """Duration, sample rate and integrated loudness (LUFS) of a track."""
+    return {**await ffprobe_track(audio_file), "loudness": await measure_loudness(audio_file)}
+
+
+class AudioIndex:
+    """Probe results and pre-encoded AAC copies for every track in audio/."""
+
+    def __init__(self, audio_dir: Path, cache_dir: Path, settings: dict = AUDIO_ENCODE):
+        self.audio_dir = audio_dir
+        self.cache_dir = cache_dir
+        self.index_file = cache_dir / "index.json"
+        self.aac_settings = dict(settings)
+        self.tracks: dict[str, dict] = {}
+        if self.index_file.exists():
+            with open(self.index_file) as f:
+                self.tracks = json.load(f)
+
+    def _is_current(self, entry: dict, audio_file: Path) -> bool:
+        return (
+            entry.get("source") == file_identity(audio_file)
+            and entry.get("aac_settings") == self.aac_settings
+            and (self.cache_dir / entry.get("aac", "")).is_file()
+        )
+
+    async def _index_track(self, audio_file: Path) -> dict:
+        tag = hashlib.sha1(audio_file.name.encode()).hexdigest()[:8]
+        aac_name = f"{audio_file.stem}-{tag}.m4a"
+        returncode, _, stderr = await run_process([
+            "ffmpeg", "-y", "-i", str(audio_file), "-vn",
+            "-c:a", self.aac_settings["acodec"], "-b:a", self.aac_settings["abitrate"],
+            str(self.cache_dir / aac_name),
+        ])
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg error:\n    {stderr[-300:]}")
+        return {
+            "source": file_identity(audio_file),
+            "aac": aac_name,
+            "aac_settings": self.aac_settings,
+            **await probe_track(audio_file),
+        }
+
+    async def refresh(self, workers: int = os.cpu_count() or 1) -> list[dict]:
+        """Bring the index in line with audio/ and return every usable track.
+
+        Each returned track dict has `name`, `path` (the source file), `aac`
+        (the pre-encoded copy), `duration`, `sample_rate` and `loudness`.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = {f.name: f for f in scan_audio(self.audio_dir)}
+
+        removed = set(self.tracks) - set(files)
+        for name in removed:
+            (self.cache_dir / self.tracks.pop(name)["aac"]).unlink(missing_ok=True)
+
+        stale = [f for name, f in files.items() if not self._is_current(self.tracks.get(name, {}), f)]
+        if stale:
+            print(f"Indexing {len(stale)} audio track(s)...")
+            limit = asyncio.Semaphore(workers)
+
+            async def index(audio_file: Path):
+                async with limit:
+                    try:
+                        self.tracks[audio_file.name] = await self._index_track(audio_file)
+                    except Exception as e:
+                        self.tracks.pop(audio_file.name, None)
+                        print(f"  ✗ {audio_file.name} — {e}")
+
+            await asyncio.gather(*(index(f) for f in stale))
+        if stale or removed:
+            self.save()
+
+        return [
+            {**self.tracks[name], "name": name, "path": files[name], "aac": self.cache_dir / self.tracks[name]["aac"]}
+            for name in sorted(self.tracks)
+        ]
+
+    def save(self):
+        tmp = self.index_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.tracks, f, indent=2, sort_keys=True)
+        tmp.replace(self.index_file)
@@ -0,0 +1,100 @@
+"""
+ffmpeg encoding for the fade-in videos, run as asyncio subprocesses so many
+encodes can overlap with each other and with browser rendering.
+
+Frames never touch the disk: the "before" and "after" PNGs are streamed to
+ffmpeg's stdin as a two-frame image2pipe input and split apart in the
+filter graph. Audio comes pre-encoded from the audio index (see
+audio_index.py) and is stream-copied.
+
+The videos are a short crossfade followed by a completely static frame, so
+the encode is split accordingly: the crossfade is rendered at full frame
+rate, the still tail at the preset's `still_fps`, and the two are
+concatenated in the same filter graph with libx264's stillimage tuning.
+"""
+import asyncio
+from pathlib import Path
+
+# Video encode presets (the chosen one is part of each video's cache key)
+VIDEO_PRESETS = {
+    # Quick previews: 1 fps still tail, lowest quality
+    "draft": {
+        "fade": 1.0, "fps": 25, "still_fps": 1,
+        "vcodec": "libx264", "preset": "ultrafast", "tune": "stillimage", "crf": 28,
+    },
+    "fast": {
+        "fade": 1.0, "fps": 25, "still_fps": 5,
+        "vcodec": "libx264", "preset": "veryfast", "tune": "stillimage", "crf": 23,
+    },
+    # What gets published. Instagram Reels want 23-60 fps, so the still tail
+    # stays at the full frame rate; stillimage tuning keeps it cheap.
+    "final": {
+        "fade": 1.0, "fps": 25, "still_fps": 25,
+        "vcodec": "libx264", "preset": "medium", "tune": "stillimage", "crf": 18,
+    },
+}
+DEFAULT_PRESET = "final"
+
+# Audio is encoded once per track by the audio index, then stream-copied
+AUDIO_ENCODE = {"acodec": "aac", "abitrate": "192k"}
+
+
+async def run_process(cmd: list[str], stdin: bytes | None = None) -> tuple[int, str, str]:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate(stdin)
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+def ffmpeg_command(
+    aac_file: Path,
+    audio_duration: float,
+    output: Path,
+    settings: dict,
+) -> list[str]:
+    """ffmpeg command that reads the before+after PNGs from stdin."""
+    fade, fps, still_fps = settings["fade"], settings["fps"], settings["still_fps"]
+    # Pad the still past the end; -t trims to the exact audio length
+    still_duration = max(audio_duration - fade, 0) + 1
+    return [
+        "ffmpeg", "-y",
+        # Input 0: frame 0 = "before", frame 1 = "after", piped on stdin
+        "-f", "image2pipe", "-c:v", "png", "-framerate", "1", "-i", "pipe:0",
+        # Input 1: pre-encoded AAC audio
+        "-i", str(aac_file),
+        # Filter: crossfade before→after at full rate, then hold "after" at still_fps
+        "-filter_complex",
+        f"[0:v]split=2[s0][s1];"
+        f"[s0]trim=end_frame=1,setpts=PTS-STARTPTS,fps={fps},tpad=stop_mode=clone:stop_duration={fade}[before];"
+        f"[s1]trim=start_frame=1:end_frame=2,setpts=PTS-STARTPTS,split=2[a0][a1];"
+        f"[a0]fps={fps},tpad=stop_mode=clone:stop_duration={fade}[after];"
+        f"[before][after]xfade=transition=fade:duration={fade}:offset=0,trim=duration={fade}[fade];"
+        f"[a1]fps={still_fps},tpad=stop_mode=clone:stop_duration={still_duration}[still];"
+        f"[fade][still]concat=n=2:v=1:a=0,format=yuv420p[v]",
+        "-map", "[v]", "-map", "1:a",
+        "-c:v", settings["vcodec"], "-preset", settings["preset"],
+        "-tune", settings["tune"], "-crf", str(settings["crf"]),
+        "-fps_mode", "vfr",
+        "-c:a", "copy",
+        "-t", str(audio_duration),
+        str(output),
+    ]
+
+
+async def encode_video(
+    before_png: bytes,
+    after_png: bytes,
+    track: dict,
+    output: Path,
+    settings: dict = VIDEO_PRESETS[DEFAULT_PRESET],
+):
+    """Encode one video from in-memory frames and an indexed audio track.
+    Raises RuntimeError on ffmpeg failure."""
+    cmd = ffmpeg_command(track["aac"], track["duration"], output, settings)
+    returncode, _, stderr = await run_process(cmd, stdin=before_png + after_png)
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg error:\n    {stderr[-300:]}")
@@ -0,0 +1,57 @@
+"""
+Bundled fonts, inlined into the card HTML as @font-face data URIs.
+
+Renders never touch the network and never depend on what the host has
+installed: the static Inter TTFs (cut from the OFL Inter release) and the
+Noto Emoji fallback live in fonts/ next to generate.py. A missing file is
+an error — rendering with whatever sans-serif the system happens to have
+would silently change every card.
+"""
+import base64
+from functools import lru_cache
+from pathlib import Path
+
+FONTS_DIR = Path(__file__).parent.parent / "fonts"
+FONT_FAMILY = "Inter"
+EMOJI_FONT_FAMILY = "Noto Emoji"
+
+# CSS font-weight → static TTF in fonts/
+FONT_FILES = {
+    400: "Inter-Regular.ttf",
+    600: "Inter-SemiBold.ttf",
+    700: "Inter-Bold.ttf",
+    800: "Inter-ExtraBold.ttf",
+    900: "Inter-Black.ttf",
+}
+
+# Inter has no emoji; hooks like "prove me wrong 🤷" fall back to this
+EMOJI_FONT_FILE = FONTS_DIR / "NotoEmoji-Regular.ttf"
+
+
+def font_path(weight: int) -> Path:
+    return FONTS_DIR / FONT_FILES[weight]
+
+
+def check_fonts():
+    """Raise FileNotFoundError unless every bundled font is present."""
+    paths = [font_path(weight) for weight in FONT_FILES] + [EMOJI_FONT_FILE]
+    missing = [path.name for path in paths if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing fonts in {FONTS_DIR}/: {', '.join(missing)}")
+
+
+def _face(family: str, path: Path, weight: str) -> str:
+    b64 = base64.b64encode(path.read_bytes()).decode()
+    return (
+        f"@font-face {{ font-family: '{family}'; font-weight: {weight}; "
+        f"font-style: normal; src: url(data:font/ttf;base64,{b64}) format('truetype'); }}"
+    )
+
+
+@lru_cache(maxsize=None)
+def font_face_css() -> str:
+    """@font-face rules for every bundled font, embedded as data URIs."""
+    check_fonts()
+    rules = [_face(FONT_FAMILY, font_path(weight), str(weight)) for weight in FONT_FILES]
+    rules.append(_face(EMOJI_FONT_FAMILY, EMOJI_FONT_FILE, "100 900"))
+    return "\n".join(rules)
@@ -0,0 +1,77 @@
+"""
+Output encodings for rendered cards.
+
+Both backends produce lossless PNG bytes; encode_image() turns them into the
+file that is written to output/ and later uploaded by social-scheduler:
+
+    png   lossless, re-compressed with Pillow's optimiser
+    jpeg  4:4:4 chroma so thin text and gradients stay clean; the only still
+          format Instagram's Graph API accepts
+    webp  smallest at equal quality; fine for Facebook, not for Instagram
+
+`quality` (1-100) applies to jpeg and webp.
+"""
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+IMAGE_FORMATS = {
+    "png": {"ext": ".png", "pil": "PNG", "options": {"optimize": True}},
+    "jpeg": {"ext": ".jpg", "pil": "JPEG", "options": {"optimize": True, "progressive": True, "subsampling": 0}},
+    "webp": {"ext": ".webp", "pil": "WEBP", "options": {"method": 4}},
+}
+DEFAULT_FORMAT = "png"
+DEFAULT_QUALITY = 90
+
+
+def image_settings(fmt: str, quality: int = DEFAULT_QUALITY) -> dict:
+    """Everything that determines the encoded bytes, for cache keys."""
+    settings = {"format": fmt, **IMAGE_FORMATS[fmt]["options"]}
+    if fmt != "png":
+        settings["quality"] = quality
+    return settings
+
+
+def encode_image(png: bytes, fmt: str = DEFAULT_FORMAT, quality: int = DEFAULT_QUALITY) -> bytes:
+    """Re-encode a rendered PNG as `fmt`."""
+    spec = IMAGE_FORMATS[fmt]
+    image = Image.open(io.BytesIO(png)).convert("RGB")
+    options = dict(spec["options"])
+    if fmt != "png":
+        options["quality"] = quality
+    buffer = io.BytesIO()
+    image.save(buffer, spec["pil"], **options)
+    return buffer.getvalue()
+
+
+class ImageEncoder:
+    """Runs encode_image() on `workers` threads, off the event loop.
+    Pillow releases the GIL while compressing, so threads encode in parallel
+    without pickling every frame across a process boundary."""
+
+    def __init__(self, fmt: str = DEFAULT_FORMAT, quality: int = DEFAULT_QUALITY, workers: int = 4):
+        self.fmt = fmt
+        self.quality = quality
+        self.ext = IMAGE_FORMATS[fmt]["ext"]
+        self._executor = ThreadPoolExecutor(max(1, workers), thread_name_prefix="encode")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown()
+
+    async def encode(self, png: bytes, fmt: str | None = None, quality: int | None = None) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, encode_image, png, fmt or self.fmt, quality or self.quality)
+
+    async def measure(self, png: bytes, fmt: str) -> tuple[int, float]:
+        """(encoded size in bytes, seconds spent encoding) for one format."""
+        def timed():
+            start = time.perf_counter()
+            size = len(encode_image(png, fmt, self.quality))
+            return size, time.perf_counter() - start
+        return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
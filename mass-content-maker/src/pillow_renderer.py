@@ -0,0 +1,358 @@
+"""
+Browserless tier-card renderer.
+
+Draws the same 1080×1920 card as the HTML template directly with Pillow and
+NumPy: no Chromium launch, a fraction of the memory, and safe to run in
+plain worker processes. The layout constants below mirror the CSS in
+template.py — keep the two in step (compare_backends in generate.py diffs
+the outputs pixel by pixel). check_render in generate.py holds this backend
+to the committed images in reference/ without needing a browser.
+"""
+import asyncio
+import io
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from src.fonts import EMOJI_FONT_FILE, check_fonts, font_path
+from src.template import LOGO_FILE, TIER_COLORS, text_scale
+
+WIDTH, HEIGHT = 1080, 1920
+
+# Zero-width joiners and variation selectors inside emoji sequences
+EMOJI_JOINERS = {"\u200d", "\ufe0e", "\ufe0f"}
+
+BLACK = (0, 0, 0)
+HOOK_BG = (245, 245, 245)       # #f5f5f5
+HOOK_COLOR = (26, 26, 26)       # #1a1a1a
+HOOK_SUB_COLOR = (85, 85, 85)   # #555
+CARD_BG = (10, 10, 10)          # #0a0a0a
+APP_NAME_COLOR = (204, 204, 204)  # #ccc
+TIER_TEXT_COLOR = (255, 255, 255)
+DIVIDER_COLOR = (51, 51, 51)    # #333
+METRIC_GRADIENT = [(99, 102, 241), (168, 85, 247), (236, 72, 153)]  # #6366f1 → #a855f7 → #ec4899
+
+TOP_PADDING = 120
+BOTTOM_PADDING = 160
+SIDE_PADDING = 70
+CONTENT_WIDTH = WIDTH - 2 * SIDE_PADDING
+
+
+def _hex(color: str) -> tuple[int, int, int]:
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def _gradient_stops(css: str) -> list[tuple[int, int, int]]:
+    """Colour stops from a TIER_COLORS linear-gradient() string."""
+    return [_hex(c) for c in re.findall(r"#[0-9A-Fa-f]{6}", css)]
+
+
+def _interpolate(stops: list[tuple], t: np.ndarray) -> np.ndarray:
+    """Evenly spaced CSS colour stops sampled at positions t ∈ [0, 1] → RGB array."""
+    t = np.clip(t, 0.0, 1.0)
+    positions = np.linspace(0.0, 1.0, len(stops))
+    channels = [np.interp(t, positions, [s[c] for s in stops]) for c in range(3)]
+    return np.stack(channels, axis=-1)
+
+
+def is_emoji(char: str) -> bool:
+    return ord(char) >= 0x1F000 or unicodedata.category(char) == "So" or char in EMOJI_JOINERS
+
+
+class CardRenderer:
+    """Fonts, logo and tier icons loaded once; render() draws one card."""
+
+    def __init__(self, logo_file: Path = LOGO_FILE):
+        check_fonts()
+        self._fonts = {}
+        self._emoji_fonts = {}
+        self._logo = self._rounded_logo(logo_file)
+        self._tier_icons = {name: self._tier_icon(colors) for name, colors in TIER_COLORS.items()}
+        # background: linear-gradient(90deg, ...) across the metric's content box
+        t = (np.arange(WIDTH, dtype=np.float32) - SIDE_PADDING + 0.5) / CONTENT_WIDTH
+        self._metric_gradient = _interpolate(METRIC_GRADIENT, t).astype(np.uint8)[None]
+
+    # ── Assets ────────────────────────────────────────────────────────────
+
+    def font(self, weight: int, size: float) -> ImageFont.FreeTypeFont:
+        key = (weight, size)
+        if key not in self._fonts:
+            self._fonts[key] = ImageFont.truetype(str(font_path(weight)), size)
+        return self._fonts[key]
+
+    def emoji_font(self, size: float) -> ImageFont.FreeTypeFont:
+        """The Noto Emoji fallback at the size of the surrounding text."""
+        if size not in self._emoji_fonts:
+            self._emoji_fonts[size] = ImageFont.truetype(str(EMOJI_FONT_FILE), size)
+        return self._emoji_fonts[size]
+
+    @staticmethod
+    def _rounded_logo(logo_file: Path, size: int = 96, radius: int = 16) -> Image.Image:
+        logo = Image.open(logo_file).convert("RGBA")
+        logo.thumbnail((size, size), Image.LANCZOS)  # object-fit: contain
+        boxed = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        boxed.paste(logo, ((size - logo.width) // 2, (size - logo.height) // 2))
+        mask = Image.new("L", (size, size), 0)
+        ImageDraw.Draw(mask).rounded_rectangle((0, 0, size - 1, size - 1), radius, fill=255)
+        boxed.putalpha(Image.fromarray(np.minimum(np.asarray(boxed.getchannel("A")), np.asarray(mask))))
+        return boxed
+
+    @staticmethod
+    def _tier_icon(colors: dict, size: int = 84, blur: int = 12) -> Image.Image:
+        """84px gradient circle with its 12px glow, on a transparent tile."""
+        pad = blur * 2
+        tile = size + 2 * pad
+
+        # box-shadow: 0 0 12px <shadow>44 — a blurred disc at ~27% opacity
+        glow_mask = Image.new("L", (tile, tile), 0)
+        ImageDraw.Draw(glow_mask).ellipse((pad, pad, pad + size - 1, pad + size - 1), fill=0x44)
+        glow_mask = glow_mask.filter(ImageFilter.GaussianBlur(blur / 2))
+        icon = Image.new("RGBA", (tile, tile), _hex(colors["shadow"]) + (0,))
+        icon.putalpha(glow_mask)
+
+        # linear-gradient(135deg, ...) runs top-left → bottom-right
+        y, x = np.mgrid[0:size, 0:size].astype(np.float32) + 0.5
+        t = ((x - size / 2) + (y - size / 2)) / (size * 2) + 0.5
+        rgb = _interpolate(_gradient_stops(colors["bg"]), t).astype(np.uint8)
+        disc = Image.fromarray(rgb, "RGB").convert("RGBA")
+        disc_mask = Image.new("L", (size, size), 0)
+        ImageDraw.Draw(disc_mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+        disc.putalpha(disc_mask)
+        icon.alpha_composite(disc, (pad, pad))
+        return icon
+
+    # ── Text ──────────────────────────────────────────────────────────────
+
+    def _runs(self, text: str):
+        """Split text into (is_emoji, chunk) runs."""
+        runs = []
+        for char in text:
+            emoji = is_emoji(char)
+            if runs and runs[-1][0] == emoji:
+                runs[-1][1] += char
+            else:
+                runs.append([emoji, char])
+        return runs
+
+    def text_width(self, text: str, font: ImageFont.FreeTypeFont, letter_spacing: float = 0.0) -> float:
+        width = 0.0
+        for emoji, chunk in self._runs(text):
+            if emoji:
+                width += self.emoji_font(font.size).getlength(chunk)
+            else:
+                width += font.getlength(chunk) + letter_spacing * len(chunk)
+        return width
+
+    def wrap(self, text: str, font: ImageFont.FreeTypeFont, max_width: float) -> list[str]:
+        """Greedy word wrap, as the browser does for normal white-space."""
+        lines = []
+        line = ""
+        for word in text.split():
+            candidate = f"{line} {word}" if line else word
+            if line and self.text_width(candidate, font) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        if line:
+            lines.append(line)
+        return lines or [""]
+
+    @staticmethod
+    def line_box(font: ImageFont.FreeTypeFont, line_height: float | None) -> tuple[float, float]:
+        """(line height, baseline offset from the line top) for CSS line-height."""
+        ascent, descent = font.getmetrics()
+        height = line_height if line_height is not None else ascent + descent
+        return height, (height - (ascent + descent)) / 2 + ascent
+
+    def draw_text(self, canvas: Image.Image, x: float, baseline: float, text: str,
+                  font: ImageFont.FreeTypeFont, fill, letter_spacing: float = 0.0):
+        draw = ImageDraw.Draw(canvas)
+        for emoji, chunk in self._runs(text):
+            if emoji:
+                emoji_font = self.emoji_font(font.size)
+                draw.text((x, baseline), chunk, font=emoji_font, fill=fill, anchor="ls")
+                x += emoji_font.getlength(chunk)
+            elif letter_spacing:
+                for char in chunk:
+                    draw.text((x, baseline), char, font=font, fill=fill, anchor="ls")
+                    x += font.getlength(char) + letter_spacing
+            else:
+                draw.text((x, baseline), chunk, font=font, fill=fill, anchor="ls")
+                x += font.getlength(chunk)
+
+    def centered_lines(self, canvas: Image.Image, top: float, text: str, font, fill,
+                       line_height: float | None = None, max_width: float = CONTENT_WIDTH) -> float:
+        """Draw wrapped, centred text from `top`; returns the block height."""
+        height, baseline = self.line_box(font, line_height)
+        lines = self.wrap(text, font, max_width)
+        for n, line in enumerate(lines):
+            x = SIDE_PADDING + (max_width - self.text_width(line, font)) / 2
+            self.draw_text(canvas, x, top + n * height + baseline, line, font, fill)
+        return height * len(lines)
+
+    # ── Layout ────────────────────────────────────────────────────────────
+
+    def hook_height(self, variation: dict) -> float:
+        """Height of the light hook section for a variation."""
+        hook_size = 62 * text_scale(variation, "hook")
+        sub_size = 38 * text_scale(variation, "hook_sub")
+        hook_lines = len(self.wrap(variation["hook"], self.font(800, hook_size), CONTENT_WIDTH))
+        sub_lines = len(self.wrap(variation["hook_sub"], self.font(400, sub_size), CONTENT_WIDTH))
+        return 60 + hook_lines * hook_size * 1.2 + 16 + sub_lines * sub_size * 1.3 + 40
+
+    def render(self, variation: dict, hide_card: bool = False) -> Image.Image:
+        canvas = Image.new("RGBA", (WIDTH, HEIGHT), BLACK + (255,))
+        draw = ImageDraw.Draw(canvas)
+
+        # Hook section
+        hook_top = TOP_PADDING
+        hook_bottom = hook_top + self.hook_height(variation)
+        draw.rectangle((0, hook_top, WIDTH, round(hook_bottom) - 1), fill=HOOK_BG)
+        hook_size = 62 * text_scale(variation, "hook")
+        sub_size = 38 * text_scale(variation, "hook_sub")
+        y = hook_top + 60
+        y += self.centered_lines(canvas, y, variation["hook"], self.font(800, hook_size), HOOK_COLOR, hook_size * 1.2)
+        y += 16
+        self.centered_lines(canvas, y, variation["hook_sub"], self.font(400, sub_size), HOOK_SUB_COLOR, sub_size * 1.3)
+
+        # Card section (rounded top corners) and bottom padding
+        card_top = round(hook_bottom)
+        card_bottom = HEIGHT - BOTTOM_PADDING
+        draw.rounded_rectangle((0, card_top, WIDTH - 1, HEIGHT - 1), 30, fill=CARD_BG,
+                               corners=(True, True, False, False))
+        if hide_card:
+            return canvas.convert("RGB")
+
+        # App brand: logo + name, centred as one row
+        y = card_top + 50
+        name_font = self.font(600, 64)
+        name_width = self.text_width("Seneca Chat", name_font, letter_spacing=0.5)
+        brand_width = 96 + 20 + name_width
+        x = (WIDTH - brand_width) / 2
+        canvas.alpha_composite(self._logo, (round(x), round(y)))
+        name_height, name_baseline = self.line_box(name_font, None)
+        self.draw_text(canvas, x + 116, y + (96 - name_height) / 2 + name_baseline, "Seneca Chat",
+                       name_font, APP_NAME_COLOR, letter_spacing=0.5)
+        y += 96 + 14
+
+        # Metric name with the horizontal brand gradient clipped to the text
+        y += 10
+        metric_font = self.font(900, 72 * text_scale(variation, "metric"))
+        metric_lines = len(self.wrap(variation["metric"], metric_font, CONTENT_WIDTH))
+        metric_height = round(self.line_box(metric_font, None)[0] * metric_lines)
+        metric_mask = Image.new("L", (WIDTH, metric_height), 0)
+        self.centered_lines(metric_mask, 0, variation["metric"], metric_font, 255)
+        gradient = np.repeat(self._metric_gradient, metric_height, axis=0)
+        canvas.paste(Image.fromarray(gradient, "RGB"), (0, round(y)), metric_mask)
+        y += metric_height + 30
+
+        # Tier rows: 6 rows + 6 dividers spread with space-evenly
+        tiers = list(variation["tiers"].items())
+        row_height = 84 + 2 * 14
+        divider_height = 1 + 2 * 2
+        container_bottom = card_bottom - 40
+        used = len(tiers) * (row_height + divider_height)
+        gap = max(0.0, (container_bottom - y - used) / (2 * len(tiers) + 1))
+
+        tier_font = self.font(700, 52 * text_scale(variation, "tiers"))
+        text_height, text_baseline = self.line_box(tier_font, None)
+        for tier_name, tier_value in tiers:
+            y += gap
+            icon = self._tier_icons[tier_name]
+            pad = (icon.width - 84) // 2
+            canvas.alpha_composite(icon, (SIDE_PADDING - pad, round(y + 14) - pad))
+            baseline = y + 14 + (84 - text_height) / 2 + text_baseline
+            self.draw_text(canvas, SIDE_PADDING + 84 + 28, baseline, tier_name, tier_font, TIER_TEXT_COLOR)
+            value_x = WIDTH - SIDE_PADDING - self.text_width(tier_value, tier_font)
+            self.draw_text(canvas, value_x, baseline, tier_value, tier_font, TIER_TEXT_COLOR)
+            y += row_height + gap
+            draw.rectangle((SIDE_PADDING, round(y + 2), WIDTH - SIDE_PADDING - 1, round(y + 2)), fill=DIVIDER_COLOR)
+            y += divider_height
+
+        return canvas.convert("RGB")
+
+
+@lru_cache(maxsize=None)
+def get_renderer() -> CardRenderer:
+    """The per-process renderer, loaded on first use."""
+    return CardRenderer()
+
+
+def render_png(variation: dict, hide_card: bool = False) -> bytes:
+    """Render one card to PNG bytes. Top-level so it can run in a process pool."""
+    buffer = io.BytesIO()
+    get_renderer().render(variation, hide_card=hide_card).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def render_frames(variation: dict) -> tuple[bytes, bytes]:
+    """The "before" and "after" video frames, as PNG bytes."""
+    return render_png(variation, hide_card=True), render_png(variation)
+
+
+class RasterPool:
+    """The Pillow counterpart to renderer.PagePool: `size` worker processes
+    behind the same run() / lease() / card() / frames() interface. `render(worker, job)`
+    receives None as its worker handle."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._executor = None
+        self._slots = asyncio.Semaphore(self.size)
+
+    async def __aenter__(self):
+        self._executor = ProcessPoolExecutor(self.size)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._executor.shutdown()
+        self._executor = None
+
+    async def run(self, jobs, render, on_done=None):
+        """Call `await render(None, job)` for every job, `size` at a time.
+        A job that raises passes its exception to `on_done(job, result)`."""
+        pending = iter(jobs)
+
+        async def worker():
+            for job in pending:
+                try:
+                    result = await render(None, job)
+                except Exception as e:
+                    result = e
+                if on_done:
+                    on_done(job, result)
+
+        await asyncio.gather(*(worker() for _ in range(self.size)))
+
+    @asynccontextmanager
+    async def lease(self):
+        """Wait for a free worker slot; yields None as the worker handle."""
+        async with self._slots:
+            yield None
+
+    async def card(self, _, variation: dict) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, render_png, variation)
+
+    async def frames(self, _, variation: dict) -> tuple[bytes, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, render_frames, variation)
+
+
+def pixel_diff(png_a: bytes, png_b: bytes, threshold: int = 32) -> dict:
+    """Compare two renders: mean absolute channel difference (0-255) and the
+    fraction of pixels where any channel differs by more than `threshold`."""
+    a = np.asarray(Image.open(io.BytesIO(png_a)).convert("RGB"), dtype=np.int16)
+    b = np.asarray(Image.open(io.BytesIO(png_b)).convert("RGB"), dtype=np.int16)
+    if a.shape != b.shape:
+        return {"mean": 255.0, "changed": 1.0}
+    delta = np.abs(a - b)
+    return {
+        "mean": float(delta.mean()),
+        "changed": float((delta.max(axis=-1) > threshold).mean()),
+    }
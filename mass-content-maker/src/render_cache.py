@@ -0,0 +1,108 @@
+"""
+Content-addressed render cache.
+
+output/manifest.json maps each rendered file (relative to output/) to the
+hash of everything that produced it: the variation dict, the template
+fingerprint (version, logo, fonts) and, for videos, the audio track and
+encode settings. A file whose key still matches is skipped; anything else
+is re-rendered.
+
+Sharded runs write manifest-K-of-N.json instead, and merge_shards() folds
+the shards' output directories back into one output set.
+"""
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+
+def render_key(**inputs) -> str:
+    """Stable hash of a render's inputs (any JSON-serialisable values)."""
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def file_identity(path: Path) -> dict:
+    """Cheap identity for an input file — name, size and mtime."""
+    stat = path.stat()
+    return {"name": path.name, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+class RenderManifest:
+    """The set of up-to-date outputs, with hit/miss counters for reporting."""
+
+    def __init__(self, path: Path, force: bool = False):
+        self.path = path
+        self.force = force
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        if path.exists():
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def _name(self, output: Path) -> str:
+        return output.relative_to(self.path.parent).as_posix()
+
+    def get(self, output: Path) -> dict:
+        return self.entries.get(self._name(output), {})
+
+    def is_fresh(self, output: Path, key: str) -> bool:
+        """True (and counted as a hit) if `output` exists and was built from `key`."""
+        fresh = (
+            not self.force
+            and output.exists()
+            and self.get(output).get("key") == key
+        )
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def record(self, output: Path, key: str, **meta):
+        self.entries[self._name(output)] = {"key": key, **meta}
+
+    def prune(self, keep) -> list[str]:
+        """Delete every recorded output for which keep(name) is false, and
+        forget it. Returns the pruned names."""
+        pruned = [name for name in self.entries if not keep(name)]
+        for name in pruned:
+            (self.path.parent / name).unlink(missing_ok=True)
+            del self.entries[name]
+        return pruned
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        tmp.replace(self.path)
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def merge_shards(shard_dirs: list[Path], output_dir: Path, manifest_file: Path) -> RenderManifest:
+    """Copy every shard's rendered files into `output_dir` and combine their
+    manifests into `manifest_file`. Raises ValueError if two shards produced the
+    same file from different inputs."""
+    merged = RenderManifest(manifest_file)
+    sources = {}
+    for shard_dir in shard_dirs:
+        for shard_manifest in sorted(shard_dir.glob("manifest*.json")):
+            with open(shard_manifest) as f:
+                entries = json.load(f)
+            for name, entry in entries.items():
+                if name in sources and merged.entries[name]["key"] != entry["key"]:
+                    raise ValueError(f"{name} differs between {sources[name]} and {shard_dir}")
+                src = shard_dir / name
+                if not src.exists():
+                    continue
+                dst = output_dir / name
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                if src.resolve() != dst.resolve():
+                    shutil.copy2(src, dst)
+                merged.entries[name] = entry
+                sources[name] = shard_dir
+    merged.save()
+    return merged
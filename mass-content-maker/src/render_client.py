@@ -0,0 +1,87 @@
+"""
+Client for render_daemon.py, so other tools can render cards and videos
+through an already-warm renderer instead of launching their own.
+
+    from render_client import RenderClient
+    path = RenderClient().render(variation, fmt="jpeg")
+
+Stdlib only — import it with mass-content-maker/src on sys.path, as
+social-scheduler does for variations.py.
+"""
+import http.client
+import json
+import os
+import socket
+from pathlib import Path
+
+DEFAULT_PORT = 8765
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class RenderClient:
+    """Talks to a running render daemon over localhost TCP or a Unix socket.
+    Defaults come from RENDER_DAEMON_SOCKET / RENDER_DAEMON_PORT."""
+
+    def __init__(self, port: int | None = None, socket_path: str | None = None, timeout: float = 300):
+        self.socket_path = socket_path or os.getenv("RENDER_DAEMON_SOCKET")
+        self.port = port or int(os.getenv("RENDER_DAEMON_PORT", DEFAULT_PORT))
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload: dict | None = None) -> dict:
+        if self.socket_path:
+            conn = _UnixConnection(self.socket_path, self.timeout)
+        else:
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=self.timeout)
+        try:
+            body = json.dumps(payload).encode() if payload is not None else None
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            data = json.loads(resp.read() or b"{}")
+        finally:
+            conn.close()
+        if resp.status != 200:
+            raise RuntimeError(f"Render daemon {resp.status}: {data.get('error', resp.reason)}")
+        return data
+
+    def available(self) -> bool:
+        try:
+            return self._request("GET", "/health").get("ok", False)
+        except (OSError, RuntimeError):
+            return False
+
+    def render(self, variation: dict, fmt: str | None = None, quality: int | None = None,
+               output: Path | None = None) -> Path:
+        """Render one card and return the path of the written image.
+        `output`, if given, must lie under mass-content-maker/output/."""
+        payload = {"variation": variation}
+        if fmt:
+            payload["format"] = fmt
+        if quality:
+            payload["quality"] = quality
+        if output:
+            payload["output"] = str(Path(output).resolve())
+        return Path(self._request("POST", "/render", payload)["path"])
+
+    def video(self, variation: dict, preset: str | None = None, audio: str | None = None,
+              seed: int | None = None, output: Path | None = None) -> Path:
+        """Render and encode one video and return the path of the .mp4."""
+        payload = {"variation": variation}
+        for name, value in (("preset", preset), ("audio", audio), ("seed", seed)):
+            if value is not None:
+                payload[name] = value
+        if output:
+            payload["output"] = str(Path(output).resolve())
+        return Path(self._request("POST", "/video", payload)["path"])
+
+    def stats(self) -> dict:
+        return self._request("GET", "/stats")
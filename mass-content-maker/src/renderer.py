@@ -0,0 +1,192 @@
+"""
+Playwright rendering helpers — a bounded pool of warm browser pages.
+
+Each page lives in its own browser context, so concurrent renders never share
+cookies, caches or in-flight requests, and a crashed page only costs the one
+variation it was rendering.
+
+Rendering is fully offline: every asset (fonts, logo) is inlined into the
+HTML as a data URI, and any other request is aborted. Screenshots are gated
+on the document being ready rather than on fixed sleeps.
+
+Two render modes:
+    reload  every variation is a fresh page.set_content() of the full HTML
+    patch   each page loads the empty card shell once; a variation only
+            swaps the hook, sub-hook, metric and tier rows in place
+"""
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+from src.template import build_html, get_template
+
+VIEWPORT = {"width": 1080, "height": 1920}
+RENDER_MODES = ["reload", "patch"]
+DEFAULT_RENDER_MODE = "reload"
+
+# Screenshot exactly the viewport, skipping Playwright's page-size probing
+_CLIP = {"x": 0, "y": 0, **VIEWPORT}
+
+# Resolves once web fonts are decoded and two animation frames have passed,
+# i.e. layout and paint reflect the final fonts.
+_READY_JS = """() => document.fonts.ready.then(() => new Promise(resolve =>
+    requestAnimationFrame(() => requestAnimationFrame(resolve))))"""
+
+# Reveals the hidden card content, then waits for the repaint.
+_REVEAL_CARD_JS = """() => {
+    document.querySelector('.card-content').classList.remove('hidden');
+    return new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+}"""
+
+
+# Fills the shell's slots from CardTemplate.patch(); resolves after one frame.
+_PATCH_JS = """slots => {
+    document.body.setAttribute('style', slots.style);
+    document.querySelector('.hook-text').innerHTML = slots.hook;
+    document.querySelector('.hook-sub').innerHTML = slots.hook_sub;
+    document.querySelector('.metric-name').innerHTML = slots.metric;
+    document.querySelector('.tiers-container').innerHTML = slots.tiers;
+    document.querySelector('.card-content').classList.toggle('hidden', slots.hidden);
+    return document.fonts.ready.then(() => new Promise(requestAnimationFrame));
+}"""
+
+
+async def block_network(target):
+    """Abort every outbound request made by a page or browser context."""
+    await target.route("**/*", lambda route: route.abort())
+
+
+async def wait_until_ready(page):
+    """Wait for fonts and layout to settle before taking a screenshot."""
+    await page.evaluate(_READY_JS)
+
+
+async def load_html(page, html: str):
+    """Replace the page's document and wait until it is ready to capture."""
+    await page.set_content(html, wait_until="load")
+    await wait_until_ready(page)
+
+
+async def screenshot(page) -> bytes:
+    return await page.screenshot(type="png", clip=_CLIP)
+
+
+async def capture_frames(page, html_hidden: str) -> tuple[bytes, bytes]:
+    """Capture the "before" and "after" video frames from a single page load.
+
+    `html_hidden` is the card built with hide_card=True. The "before" frame is
+    taken as loaded, then the card is revealed in place for the "after"
+    frame. Both come back as in-memory PNG bytes.
+    """
+    await load_html(page, html_hidden)
+    before = await screenshot(page)
+    await page.evaluate(_REVEAL_CARD_JS)
+    after = await screenshot(page)
+    return before, after
+
+
+async def patch_card(page, variation: dict, hide_card: bool = False):
+    """Swap a variation into a page that already holds the card shell."""
+    await page.evaluate(_PATCH_JS, get_template().patch(variation, hide_card))
+
+
+class PagePool:
+    """A fixed number of pages that render jobs concurrently.
+
+    Usage:
+        async with PagePool(browser, size=4, mode="patch") as pool:
+            await pool.run(jobs, render, on_done=report)
+
+    where `render(page, job)` typically calls pool.card(page, variation) or
+    pool.frames(page, variation). Jobs that arrive one at a time can instead
+    borrow a page with `async with pool.lease() as page:`.
+    """
+
+    def __init__(self, browser, size: int, mode: str = DEFAULT_RENDER_MODE):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {mode!r}, expected one of {RENDER_MODES}")
+        self.browser = browser
+        self.size = max(1, size)
+        self.mode = mode
+        self._contexts = []
+        self._idle = None
+        # Pages whose document is the loaded shell (patch mode)
+        self._shells = weakref.WeakSet()
+
+    async def __aenter__(self):
+        for _ in range(self.size):
+            context = await self.browser.new_context(viewport=VIEWPORT)
+            await block_network(context)
+            self._contexts.append(context)
+        return self
+
+    async def __aexit__(self, *exc):
+        for context in self._contexts:
+            await context.close()
+        self._contexts = []
+        self._idle = None
+
+    async def run(self, jobs, render, on_done=None):
+        """Call `await render(page, job)` for every job, `size` at a time.
+
+        Jobs are pulled lazily from the iterable, so a generator of any length
+        is fine. A job that raises does not abort the batch: its exception is
+        passed to `on_done(job, result)` in place of the result.
+        """
+        pending = iter(jobs)
+
+        async def worker(context):
+            page = await context.new_page()
+            for job in pending:
+                try:
+                    result = await render(page, job)
+                except Exception as e:
+                    result = e
+                    if page.is_closed():
+                        page = await context.new_page()
+                if on_done:
+                    on_done(job, result)
+            await page.close()
+
+        await asyncio.gather(*(worker(c) for c in self._contexts))
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow one page for a single job, waiting while all `size` are busy.
+        For one-off jobs (e.g. the render daemon); don't mix with run()."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for context in self._contexts:
+                self._idle.put_nowait(await context.new_page())
+        page = await self._idle.get()
+        try:
+            if page.is_closed():
+                page = await page.context.new_page()
+            yield page
+        finally:
+            self._idle.put_nowait(page)
+
+    async def load_shell(self, page):
+        """Load the empty card shell into `page`, once (patch mode)."""
+        if page not in self._shells:
+            await load_html(page, get_template().shell())
+            self._shells.add(page)
+
+    async def card(self, page, variation: dict) -> bytes:
+        """Render one card to PNG bytes."""
+        if self.mode == "patch":
+            await self.load_shell(page)
+            await patch_card(page, variation)
+        else:
+            await load_html(page, build_html(variation))
+        return await screenshot(page)
+
+    async def frames(self, page, variation: dict) -> tuple[bytes, bytes]:
+        """The "before" and "after" video frames, as PNG bytes."""
+        if self.mode == "reload":
+            return await capture_frames(page, build_html(variation, hide_card=True))
+        await self.load_shell(page)
+        await patch_card(page, variation, hide_card=True)
+        before = await screenshot(page)
+        await page.evaluate(_REVEAL_CARD_JS)
+        return before, await screenshot(page)
@@ -0,0 +1,76 @@
+"""
+Per-stage timing for the render/encode pipeline and benchmark.py.
+"""
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class StageStats:
+    """Counts jobs through one pipeline stage and the time spent on them."""
+
+    def __init__(self, name: str, window: int | None = None):
+        self.name = name
+        self.count = 0
+        self.busy = 0.0
+        # Durations for percentiles; a long-running service keeps only the last `window`
+        self.samples = deque(maxlen=window)
+        self._first = None
+        self._last = None
+
+    @contextmanager
+    def timed(self):
+        start = time.perf_counter()
+        if self._first is None:
+            self._first = start
+        try:
+            yield
+        finally:
+            self._add(start, time.perf_counter())
+
+    def record(self, seconds: float):
+        """Count a job timed elsewhere, ending now."""
+        end = time.perf_counter()
+        if self._first is None:
+            self._first = end - seconds
+        self._add(end - seconds, end)
+
+    def _add(self, start: float, end: float):
+        self.busy += end - start
+        self.samples.append(end - start)
+        self.count += 1
+        self._last = end
+
+    @property
+    def wall(self) -> float:
+        if self._first is None:
+            return 0.0
+        return self._last - self._first
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of the job durations, q in [0, 100]."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "wall": round(self.wall, 4),
+            "busy": round(self.busy, 4),
+            "p50": round(self.percentile(50), 4),
+            "p95": round(self.percentile(95), 4),
+            "max": round(max(self.samples, default=0.0), 4),
+        }
+
+    def summary(self) -> str:
+        if not self.count:
+            return f"{self.name:<7} no jobs"
+        rate = self.count / self.wall if self.wall else float("inf")
+        return (
+            f"{self.name:<7} {self.count} job(s) in {self.wall:.1f}s "
+            f"({rate:.2f}/s, {self.busy / self.count:.2f}s each)"
+        )
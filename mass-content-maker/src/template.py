@@ -0,0 +1,321 @@
+"""
+Compiled card template.
+
+Everything that is identical across variations — the logo data URI, the
+bundled font faces, ~200 lines of CSS and the HTML skeleton — is built once
+per process into a list of static fragments. Rendering a variation only
+fills in the hook, sub-hook, metric and tier rows and joins the pieces.
+"""
+import base64
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from src.fonts import font_face_css
+
+# MCM_LOGO_FILE swaps in another logo, e.g. benchmark.py's committed stand-in
+LOGO_FILE = Path(os.getenv("MCM_LOGO_FILE") or Path(__file__).parent.parent / "logo.png")
+
+# Bump whenever the CSS or markup changes so cached renders are invalidated.
+TEMPLATE_VERSION = 3
+
+TIER_COLORS = {
+    "Bronze": {"bg": "linear-gradient(135deg, #CD7F32, #8B4513)", "shadow": "#CD7F32"},
+    "Gold": {"bg": "linear-gradient(135deg, #FFD700, #B8860B)", "shadow": "#FFD700"},
+    "Emerald": {"bg": "linear-gradient(135deg, #50C878, #2E8B57)", "shadow": "#50C878"},
+    "Diamond": {"bg": "linear-gradient(135deg, #B9F2FF, #4169E1)", "shadow": "#4169E1"},
+    "Champion": {"bg": "linear-gradient(135deg, #FF4444, #8B0000)", "shadow": "#FF4444"},
+    "Iridescent": {"bg": "linear-gradient(135deg, #E0C3FC, #8EC5FC, #F5576C)", "shadow": "#E0C3FC"},
+}
+
+# Optional per-variation text scaling, e.g. variation["scale"] = {"hook": 0.9},
+# set by text_fit's auto-shrink and applied through these CSS variables.
+TEXT_SCALES = {
+    "hook": "--hook-scale",
+    "hook_sub": "--sub-scale",
+    "metric": "--metric-scale",
+    "tiers": "--tier-scale",
+}
+
+_CSS = """
+    * {
+        margin: 0;
+        padding: 0;
+        box-sizing: border-box;
+    }
+
+    body {
+        width: 1080px;
+        height: 1920px;
+        font-family: 'Inter', 'Noto Emoji', sans-serif;
+        background: #000;
+        display: flex;
+        flex-direction: column;
+    }
+
+    .top-padding {
+        height: 120px;
+        background: #000;
+        flex-shrink: 0;
+    }
+
+    .hook-section {
+        background: #f5f5f5;
+        padding: 60px 70px 40px;
+        text-align: center;
+    }
+
+    .hook-text {
+        font-size: calc(62px * var(--hook-scale, 1));
+        font-weight: 800;
+        color: #1a1a1a;
+        line-height: 1.2;
+        margin-bottom: 16px;
+    }
+
+    .hook-sub {
+        font-size: calc(38px * var(--sub-scale, 1));
+        font-weight: 400;
+        color: #555;
+        line-height: 1.3;
+    }
+
+    .card-section {
+        flex: 1;
+        background: #0a0a0a;
+        border-radius: 30px 30px 0 0;
+        padding: 50px 70px 40px;
+        display: flex;
+        flex-direction: column;
+    }
+
+    .card-content {
+        display: flex;
+        flex-direction: column;
+        flex: 1;
+    }
+
+    .card-content.hidden {
+        visibility: hidden;
+    }
+
+    .app-brand {
+        text-align: center;
+        margin-bottom: 14px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        gap: 20px;
+    }
+
+    .app-logo {
+        width: 96px;
+        height: 96px;
+        object-fit: contain;
+        border-radius: 16px;
+    }
+
+    .app-name {
+        font-size: 64px;
+        font-weight: 600;
+        color: #ccc;
+        letter-spacing: 0.5px;
+    }
+
+    .metric-name {
+        text-align: center;
+        font-size: calc(72px * var(--metric-scale, 1));
+        font-weight: 900;
+        background: linear-gradient(90deg, #6366f1, #a855f7, #ec4899);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin-bottom: 30px;
+        margin-top: 10px;
+    }
+
+    .tiers-container {
+        flex: 1;
+        display: flex;
+        flex-direction: column;
+        justify-content: space-evenly;
+    }
+
+    .tier-row {
+        display: flex;
+        align-items: center;
+        justify-content: space-between;
+        padding: 14px 0;
+    }
+
+    .tier-left {
+        display: flex;
+        align-items: center;
+        gap: 28px;
+    }
+
+    .tier-icon {
+        width: 84px;
+        height: 84px;
+        border-radius: 50%;
+        flex-shrink: 0;
+    }
+
+    .tier-name {
+        font-size: calc(52px * var(--tier-scale, 1));
+        font-weight: 700;
+        color: #fff;
+    }
+
+    .tier-value {
+        font-size: calc(52px * var(--tier-scale, 1));
+        font-weight: 700;
+        color: #fff;
+    }
+
+    .tier-divider {
+        height: 1px;
+        background: #333;
+        margin: 2px 0;
+    }
+
+    .bottom-padding {
+        height: 160px;
+        background: #0a0a0a;
+        flex-shrink: 0;
+    }
+"""
+
+_TIER_ROW_TAIL = """</span>
+        </div>
+        <div class="tier-divider"></div>
+        """
+
+
+def text_scale(variation: dict, field: str) -> float:
+    return (variation.get("scale") or {}).get(field, 1.0)
+
+
+def scale_style(variation: dict) -> str:
+    """Inline body style carrying the variation's text scales ("" if none)."""
+    return ";".join(
+        f"{var}:{text_scale(variation, field):g}"
+        for field, var in TEXT_SCALES.items() if text_scale(variation, field) != 1
+    )
+
+
+def get_logo_base64(logo_file: Path = LOGO_FILE) -> str:
+    """Read the logo file and return as a base64 data URI."""
+    b64 = base64.b64encode(logo_file.read_bytes()).decode()
+    return f"data:image/png;base64,{b64}"
+
+
+class CardTemplate:
+    """The ranked-tier card with all static parts pre-rendered."""
+
+    def __init__(self, logo_file: Path = LOGO_FILE):
+        self.logo_bytes = logo_file.read_bytes()
+        logo_uri = get_logo_base64(logo_file)
+        fonts_css = font_face_css()
+
+        # Identifies everything static that ends up in a render
+        digest = hashlib.sha256(f"v{TEMPLATE_VERSION}".encode())
+        digest.update(self.logo_bytes)
+        digest.update(fonts_css.encode())
+        self.fingerprint = digest.hexdigest()
+
+        self._head = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+{fonts_css}
+{_CSS}
+</style>
+</head>
+<body"""
+        self._after_body = """>
+    <div class="top-padding"></div>
+    <div class="hook-section">
+        <div class="hook-text">"""
+        self._after_hook = """</div>
+        <div class="hook-sub">"""
+        self._after_hook_sub = """</div>
+    </div>
+    <div class="card-section">
+        <div class="card-content"""
+        self._after_card_class = f"""">
+            <div class="app-brand">
+                <img class="app-logo" src="{logo_uri}" alt="Seneca Chat">
+                <span class="app-name">Seneca Chat</span>
+            </div>
+            <div class="metric-name">"""
+        self._after_metric = """</div>
+            <div class="tiers-container">
+"""
+        self._tail = """
+            </div>
+        </div>
+    </div>
+    <div class="bottom-padding"></div>
+</body>
+</html>"""
+        self._tier_row_head = {
+            name: f"""
+        <div class="tier-row">
+            <div class="tier-left">
+                <div class="tier-icon" style="background: {colors['bg']}; box-shadow: 0 0 12px {colors['shadow']}44;"></div>
+                <span class="tier-name">{name}</span>
+            </div>
+            <span class="tier-value">"""
+            for name, colors in TIER_COLORS.items()
+        }
+
+    def tiers_html(self, tiers: dict) -> str:
+        """The rows inside .tiers-container."""
+        parts = []
+        for tier_name, tier_value in tiers.items():
+            parts += (self._tier_row_head[tier_name], tier_value, _TIER_ROW_TAIL)
+        return "".join(parts)
+
+    def render(self, variation: dict, hide_card: bool = False) -> str:
+        """Build the HTML for a single ranked-tier image.
+        If hide_card=True, the card content is invisible (for fade-in effect).
+        """
+        style = scale_style(variation)
+        return "".join([
+            self._head, f' style="{style}"' if style else "",
+            self._after_body, variation["hook"],
+            self._after_hook, variation["hook_sub"],
+            self._after_hook_sub, " hidden" if hide_card else "",
+            self._after_card_class, variation["metric"],
+            self._after_metric,
+            self.tiers_html(variation["tiers"]),
+            self._tail,
+        ])
+
+    def shell(self) -> str:
+        """The document with every variable slot empty, for DOM-patch rendering."""
+        return self.render({"hook": "", "hook_sub": "", "metric": "", "tiers": {}})
+
+    def patch(self, variation: dict, hide_card: bool = False) -> dict:
+        """The slot contents that turn shell() into render(variation, hide_card)."""
+        return {
+            "hook": variation["hook"],
+            "hook_sub": variation["hook_sub"],
+            "metric": variation["metric"],
+            "tiers": self.tiers_html(variation["tiers"]),
+            "hidden": hide_card,
+            "style": scale_style(variation),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_template() -> CardTemplate:
+    """The process-wide template, compiled on first use."""
+    return CardTemplate()
+
+
+def build_html(variation: dict, hide_card: bool = False) -> str:
+    """Build the HTML for a single ranked-tier image using the shared template."""
+    return get_template().render(variation, hide_card=hide_card)
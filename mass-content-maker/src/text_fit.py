@@ -0,0 +1,180 @@
+"""
+Offline text-fit check for variations.
+
+Catches hooks, metrics and tier rows that overflow the 1080×1920 card before
+anything is rendered. Text is measured with the bundled Inter fonts, once
+per word at a reference size and scaled linearly from there, and then
+wrapped greedily like the browser does. That is cheap enough to check tens
+of thousands of variations in well under a second. The layout model is the
+one pillow_renderer draws, which mirrors the template CSS.
+
+Only real overflow is a problem: a word wider than its box, a tier row
+wider than the card, or content taller than the card. Text that merely
+wraps to more lines than reads well is a warning and still renders.
+
+fit() auto-shrinks an overflowing variation by setting variation["scale"]
+(see template.TEXT_SCALES) in steps, down to MIN_SCALE.
+"""
+from PIL import ImageFont
+
+from src.fonts import EMOJI_FONT_FILE, check_fonts, font_path
+from src.pillow_renderer import BOTTOM_PADDING, CONTENT_WIDTH, HEIGHT, TOP_PADDING, is_emoji
+from src.template import text_scale
+
+REF_SIZE = 100
+
+# field: (font weight, base size in px, line height in em or None for normal)
+TEXT_FIELDS = {
+    "hook": (800, 62, 1.2),
+    "hook_sub": (400, 38, 1.3),
+    "metric": (900, 72, None),
+}
+# More lines than this still fits, but is worth a warning
+LONG_TEXT_LINES = {"hook": 3, "hook_sub": 2, "metric": 2}
+TIER_WEIGHT, TIER_SIZE = 700, 52
+TIER_ICON_WIDTH = 84 + 28  # icon plus the gap before the tier name
+TIER_ROW_HEIGHT = 84 + 2 * 14 + 1 + 2 * 2  # row padding plus divider
+
+# Fixed card chrome above the metric: section padding, logo row, margins
+CARD_CHROME = 50 + 96 + 14 + 10 + 30
+TIERS_BOTTOM = HEIGHT - BOTTOM_PADDING - 40
+
+MIN_SCALE = 0.7
+SCALE_STEP = 0.05
+
+
+class TextFit:
+    """Word widths and font metrics, measured once and cached."""
+
+    def __init__(self):
+        check_fonts()
+        self._fonts = {}
+        self._emoji_font = ImageFont.truetype(str(EMOJI_FONT_FILE), REF_SIZE)
+        self._words = {}
+        self._texts = {}
+
+    def _font(self, weight: int) -> ImageFont.FreeTypeFont:
+        if weight not in self._fonts:
+            self._fonts[weight] = ImageFont.truetype(str(font_path(weight)), REF_SIZE)
+        return self._fonts[weight]
+
+    def _word_width(self, word: str, weight: int) -> float:
+        """Width of `word` at REF_SIZE."""
+        key = (weight, word)
+        width = self._words.get(key)
+        if width is None:
+            emoji = "".join(c for c in word if is_emoji(c))
+            text = "".join(c for c in word if not is_emoji(c)) if emoji else word
+            width = self._font(weight).getlength(text)
+            if emoji:
+                width += self._emoji_font.getlength(emoji)
+            self._words[key] = width
+        return width
+
+    def text_width(self, text: str, weight: int, size: float) -> float:
+        """Unwrapped width; cached per string, since tier names and values repeat."""
+        key = (weight, text)
+        ref = self._texts.get(key)
+        if ref is None:
+            words = text.split()
+            ref = sum(self._word_width(w, weight) for w in words)
+            ref += self._word_width(" ", weight) * max(0, len(words) - 1)
+            self._texts[key] = ref
+        return ref * size / REF_SIZE
+
+    def line_height(self, weight: int, size: float, em: float | None) -> float:
+        if em is not None:
+            return em * size
+        ascent, descent = self._font(weight).getmetrics()
+        return (ascent + descent) * size / REF_SIZE
+
+    def lines(self, text: str, weight: int, size: float, max_width: float = CONTENT_WIDTH) -> list[float]:
+        """Widths of the wrapped lines, using the same greedy wrap as the renderers."""
+        limit = max_width * REF_SIZE / size
+        space = self._word_width(" ", weight)
+        cached = self._words
+        widths = []
+        line = None
+        for word in text.split():
+            w = cached.get((weight, word)) or self._word_width(word, weight)
+            if line is not None and line + space + w <= limit:
+                line += space + w
+            else:
+                if line is not None:
+                    widths.append(line)
+                line = w
+        widths.append(line or 0.0)
+        return [w * size / REF_SIZE for w in widths]
+
+    # ── Checks ────────────────────────────────────────────────────────────
+
+    def problems(self, variation: dict) -> list[str]:
+        """Everything that overflows the card; empty if the variation fits."""
+        found = []
+        height = TOP_PADDING + 60 + 16 + 40 + CARD_CHROME
+        for field, (weight, base, em) in TEXT_FIELDS.items():
+            size = base * text_scale(variation, field)
+            widths = self.lines(variation[field], weight, size)
+            height += len(widths) * self.line_height(weight, size, em)
+            if max(widths) > CONTENT_WIDTH:
+                found.append(f"{field} has a word wider than the card ({max(widths):.0f}px)")
+
+        tier_size = TIER_SIZE * text_scale(variation, "tiers")
+        for name, value in variation["tiers"].items():
+            row = (TIER_ICON_WIDTH + self.text_width(name, TIER_WEIGHT, tier_size)
+                   + self.text_width(value, TIER_WEIGHT, tier_size))
+            if row > CONTENT_WIDTH:
+                found.append(f"tier {name} row is {row:.0f}px wide (max {CONTENT_WIDTH})")
+
+        spare = TIERS_BOTTOM - height - len(variation["tiers"]) * TIER_ROW_HEIGHT
+        if spare < 0:
+            found.append(f"card content overflows by {-spare:.0f}px")
+        return found
+
+    def warnings(self, variation: dict) -> list[str]:
+        """Text that fits but wraps to more lines than LONG_TEXT_LINES."""
+        found = []
+        for field, (weight, base, _) in TEXT_FIELDS.items():
+            lines = len(self.lines(variation[field], weight, base * text_scale(variation, field)))
+            if lines > LONG_TEXT_LINES[field]:
+                found.append(f"{field} wraps to {lines} lines (over {LONG_TEXT_LINES[field]})")
+        return found
+
+    def fit(self, variation: dict) -> tuple[dict, list[str]]:
+        """Shrink overflowing text until the variation fits (or hits MIN_SCALE).
+        Returns the adjusted copy and whatever problems remain."""
+        found = self.problems(variation)
+        if not found:
+            return variation, []
+
+        scale = dict(variation.get("scale") or {})
+        fitted = {**variation, "scale": scale}
+
+        def shrink(field: str) -> bool:
+            current = scale.get(field, 1.0)
+            if current <= MIN_SCALE:
+                return False
+            scale[field] = round(max(MIN_SCALE, current - SCALE_STEP), 2)
+            return True
+
+        for field, (weight, base, _) in TEXT_FIELDS.items():
+            while (max(self.lines(fitted[field], weight, base * text_scale(fitted, field))) > CONTENT_WIDTH
+                   and shrink(field)):
+                pass
+
+        def widest_row() -> float:
+            size = TIER_SIZE * text_scale(fitted, "tiers")
+            return max((TIER_ICON_WIDTH + self.text_width(n, TIER_WEIGHT, size) + self.text_width(v, TIER_WEIGHT, size)
+                        for n, v in fitted["tiers"].items()), default=0.0)
+
+        while widest_row() > CONTENT_WIDTH and shrink("tiers"):
+            pass
+
+        # Still too tall: shrink the biggest text blocks together
+        while any(p.startswith("card content overflows") for p in self.problems(fitted)):
+            if not any([shrink("hook"), shrink("metric")]):
+                break
+
+        if not any(v != 1 for v in scale.values()):
+            del fitted["scale"]
+        return fitted, self.problems(fitted)
@@ -0,0 +1,113 @@
+"""
+Variation sources and selection.
+
+Variations are read lazily, one at a time, so a batch of 100k costs the same
+memory as a batch of 10. Three source formats are accepted:
+
+    variations.json    a JSON array of full variation dicts (the original format)
+    variations.jsonl   one full variation dict per line
+    spec .json         a compact spec, expanded on the fly:
+
+        {
+          "hooks": [{"hook": "What rank is your {metric}?", "hook_sub": "..."}],
+          "metrics": [
+            {"metric": "Daily Screen Time", "tiers": {"Bronze": "5+ hrs", ...}},
+            {"metric": "Steps", "tiers": {...}, "hooks": [...]}
+          ]
+        }
+
+    Every metric is crossed with every hook (its own "hooks" if given, else
+    the shared list), metric-major, and "{metric}" in a hook becomes the
+    metric name in lower case.
+
+Also: deterministic sharding of render jobs across machines (e.g. a CI
+matrix), so every variation lands on exactly one shard.
+
+Stdlib only — social-scheduler imports this module directly.
+"""
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+SOURCE_NAMES = ["variations.jsonl", "variations.json"]
+
+
+def default_source(base_dir: Path) -> Path:
+    """The first of variations.jsonl / variations.json that exists in base_dir."""
+    for name in SOURCE_NAMES:
+        if (base_dir / name).exists():
+            return base_dir / name
+    return base_dir / SOURCE_NAMES[-1]
+
+
+# ── Reading ──────────────────────────────────────────────────────────────
+
+def _iter_jsonl(path: Path) -> Iterator[dict]:
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{n}: {e.msg}") from None
+
+
+def expand_spec(spec: dict) -> Iterator[dict]:
+    """Cross each metric's tier table with its hooks, one variation at a time."""
+    shared_hooks = spec.get("hooks", [])
+    for entry in spec["metrics"]:
+        metric = entry["metric"]
+        for hook in entry.get("hooks", shared_hooks):
+            yield {
+                "hook": hook["hook"].replace("{metric}", metric.lower()),
+                "hook_sub": hook.get("hook_sub", "").replace("{metric}", metric.lower()),
+                "metric": metric,
+                "tiers": entry["tiers"],
+            }
+
+
+def iter_variations(path: Path) -> Iterator[dict]:
+    """Stream variations from a .jsonl file, a JSON array, or a compact spec."""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        yield from _iter_jsonl(path)
+        return
+
+    with open(path) as f:
+        data = json.load(f)
+    yield from data if isinstance(data, list) else expand_spec(data)
+
+
+def count_variations(path: Path) -> int:
+    return sum(1 for _ in iter_variations(path))
+
+
+def select(path: Path, indices: Iterable[int] | None = None,
+           shard: tuple[int, int] | None = None) -> Iterator[tuple[int, dict]]:
+    """(index, variation) pairs for the requested indices (all if None) that
+    fall in `shard`, in source order. Stops reading once the last requested
+    index has been passed."""
+    variations = enumerate(iter_variations(path))
+    if indices is not None:
+        wanted = set(indices)
+        variations = islice(variations, max(wanted, default=-1) + 1)
+        variations = ((i, v) for i, v in variations if i in wanted)
+    if shard is not None:
+        k, n = shard
+        variations = ((i, v) for i, v in variations if i % n == k - 1)
+    return variations
+
+
+# ── Sharding ─────────────────────────────────────────────────────────────
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse "K/N" (1-based shard K of N) → (K, N)."""
+    try:
+        k, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}: expected K/N, e.g. 2/4")
+    if not 1 <= k <= n:
+        raise ValueError(f"Invalid shard {spec!r}: K must be between 1 and N")
+    return k, n
+
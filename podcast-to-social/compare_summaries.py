@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compare summarisation modes on real episodes.
+
+Summarises each episode once per mode and reports wall time, OpenAI calls
+and token totals side by side, so rolling vs map-reduce can be judged on
+cost and latency (and, with --output, on the summaries themselves).
+
+Usage:
+  python compare_summaries.py VIDEO_ID [VIDEO_ID ...]
+  python compare_summaries.py --transcript episode.txt
+  python compare_summaries.py VIDEO_ID --modes map-reduce --output compare.json
+
+Only transcripts longer than one chunk (~50 min) differ between modes.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cached responses would make every mode look instant
+os.environ["LLM_CACHE"] = "off"
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src import post_generator, transcript_extractor
+
+
+def load_episodes(args) -> list[dict]:
+    episodes = []
+    for video_id in args.video_ids:
+        transcript = transcript_extractor.get_transcript(video_id)
+        if transcript:
+            episodes.append({"id": video_id, "title": video_id, "transcript": transcript})
+        else:
+            print(f"  ✗ {video_id}: no transcript, skipping")
+    for path in args.transcript:
+        episodes.append({"id": path.stem, "title": path.stem, "transcript": path.read_text(encoding="utf-8")})
+    return episodes
+
+
+def run_mode(episode: dict, mode: str, channel_name: str) -> dict:
+    before = post_generator.usage()
+    start = time.perf_counter()
+    summary = post_generator.summarize_episode(
+        channel_name=channel_name,
+        episode_title=episode["title"],
+        transcript=episode["transcript"],
+        mode=mode,
+    )
+    seconds = time.perf_counter() - start
+    after = post_generator.usage()
+    return {
+        "episode": episode["id"],
+        "mode": mode,
+        "chunks": len(post_generator._chunk_transcript(episode["transcript"])),
+        "seconds": round(seconds, 2),
+        "ok": summary is not None,
+        **{key: after[key] - before[key] for key in after},
+        "summary": summary,
+    }
+
+
+def print_results(results: list[dict]):
+    print(f"\n{'episode':<16} {'mode':<11} {'chunks':>6} {'seconds':>8} {'calls':>6} "
+          f"{'prompt tok':>11} {'output tok':>11}")
+    for r in results:
+        print(f"{r['episode'][:16]:<16} {r['mode']:<11} {r['chunks']:>6} {r['seconds']:>8.1f} "
+              f"{r['calls']:>6} {r['prompt_tokens']:>11,} {r['completion_tokens']:>11,}"
+              + ("" if r["ok"] else "  ✗ failed"))
+
+    print("\nTotals:")
+    for mode in dict.fromkeys(r["mode"] for r in results):
+        rows = [r for r in results if r["mode"] == mode]
+        print(f"  {mode:<11} {sum(r['seconds'] for r in rows):8.1f}s  "
+              f"{sum(r['prompt_tokens'] for r in rows):>9,} prompt  "
+              f"{sum(r['completion_tokens'] for r in rows):>7,} output tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rolling and map-reduce episode summarisation")
+    parser.add_argument("video_ids", nargs="*", help="YouTube video IDs to fetch transcripts for")
+    parser.add_argument("--transcript", type=Path, nargs="+", default=[], metavar="FILE",
+                        help="Plain-text transcript file(s) instead of / as well as video IDs")
+    parser.add_argument("--modes", nargs="+", choices=post_generator.SUMMARY_MODES,
+                        default=post_generator.SUMMARY_MODES)
+    parser.add_argument("--channel", default="Unknown podcast", help="Channel name passed to the prompts")
+    parser.add_argument("--output", type=Path, help="Write results, including the summaries, to this JSON file")
+    args = parser.parse_args()
+
+    episodes = load_episodes(args)
+    if not episodes:
+        parser.error("no episodes to summarise")
+
+    results = []
+    for episode in episodes:
+        for mode in args.modes:
+            print(f"\n{episode['id']} — {mode}")
+            results.append(run_mode(episode, mode, args.channel))
+
+    print_results(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved {len(results)} result(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,29 @@ Commands:
   python main.py status     Show today's post summary
 
 Environment:
-  AUTO_POST=false   Set to 'true' to skip manual review (fully automated)
-  DRY_RUN=false     Set to 'true' to generate posts without saving/posting
+  AUTO_POST=false           Set to 'true' to skip manual review (fully automated)
+  DRY_RUN=false             Set to 'true' to generate posts without saving/posting
+  DB_POOL_SIZE=4            Max pooled database connections per run
+  POST_WORKERS=1            Posts published in parallel by  main.py post
+  POST_CLAIM_TIMEOUT_MINUTES=30  Retry posts left 'posting' by a crashed run after this
+  DISCOVER_WORKERS=4        Episodes processed in parallel by  main.py discover
+  TRANSCRIPT_CONCURRENCY=2  Parallel YouTube transcript fetches
+  OPENAI_CONCURRENCY=4      Parallel OpenAI requests
+  OPENAI_TIMEOUT=120        Seconds to wait for an OpenAI response
+  SUMMARY_MODE=rolling      Long-episode summaries: rolling or map-reduce
+                            (compare them with  python compare_summaries.py)
+  LLM_CACHE=sqlite          OpenAI response cache: sqlite, postgres or off
+  LLM_CACHE_BYPASS=false    'true' re-asks OpenAI (fresh answers are still cached)
+                            (TTL, size cap: see src/llm_cache.py)
 """
 import json
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
+from typing import Callable
 
 import yaml
 from dotenv import load_dotenv
@@ -41,6 +57,15 @@ CHANNELS_CONFIG   = BASE / "config" / "channels.yaml"
 SUBREDDITS_CONFIG = BASE / "config" / "subreddits.yaml"
 SCHEDULE_CONFIG   = BASE / "config" / "schedule.yaml"
 
+# Episodes (and their posts) written to the database per transaction
+DB_BATCH_SIZE = 10
+
+# Episodes processed at once by discover; each is I/O-bound end to end
+DEFAULT_DISCOVER_WORKERS = 4
+
+# youtube-transcript-api scrapes YouTube directly; too many at once get throttled
+_TRANSCRIPT_SLOTS = threading.Semaphore(int(os.getenv("TRANSCRIPT_CONCURRENCY", "2")))
+
 
 # ── Config loader ──────────────────────────────────────────────────────────────
 
@@ -54,8 +79,166 @@ def load_config() -> tuple[list, dict, dict]:
     return channels, subreddits, schedule
 
 
+# ── Concurrent output ──────────────────────────────────────────────────────────
+
+class _EpisodeOutput:
+    """
+    sys.stdout stand-in for concurrent episodes. Inside captured(), a
+    thread's prints (including those from src/ modules) are buffered and
+    written as one block when the episode finishes, so logs never interleave.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def install(cls) -> "_EpisodeOutput":
+        sys.stdout = cls(sys.stdout)
+        return sys.stdout
+
+    def uninstall(self):
+        sys.stdout = self._stream
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer.append(text)
+        else:
+            with self._lock:
+                self._stream.write(text)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    @contextmanager
+    def captured(self):
+        self._local.buffer = []
+        try:
+            yield
+        finally:
+            text, self._local.buffer = "".join(self._local.buffer), None
+            with self._lock:
+                self._stream.write(text)
+                self._stream.flush()
+
+
 # ── Commands ───────────────────────────────────────────────────────────────────
 
+def process_video(
+    video: dict,
+    label: str,
+    x_slot: str,
+    reddit_stagger: int,
+    save_episode: Callable[[dict], None],
+    auto_post: bool = False,
+    dry_run: bool = False,
+) -> list[dict]:
+    """
+    Transcript → thumbnail → summary → posts for one video.
+    The episode record goes to `save_episode` as soon as it is summarised,
+    so a failure while generating posts never throws the summary away.
+    Returns the post records for db.save_posts ([] if nothing to save).
+    """
+    print(f"\n{label} {video['title']}")
+
+    # Transcript
+    with _TRANSCRIPT_SLOTS:
+        transcript = transcript_extractor.get_transcript(video["video_id"])
+    if not transcript:
+        print("  No transcript — falling back to description")
+        transcript = video.get("description", "").strip()
+    if not transcript:
+        print("  No content available, skipping")
+        return []
+
+    # Thumbnail
+    thumbnail_path = thumbnail_fetcher.download_thumbnail(
+        video["video_id"], video["title"]
+    )
+    thumb_str = str(thumbnail_path) if thumbnail_path else None
+
+    # Summarise the full episode (one API call, shared by both posts)
+    print("  Summarising episode...")
+    summary = post_generator.summarize_episode(
+        channel_name=video["channel_name"],
+        episode_title=video["title"],
+        transcript=transcript,
+    )
+    if not summary:
+        print("  Summarisation failed, skipping")
+        return []
+
+    # Episode record (store the clean summary, not the raw transcript)
+    episode = {
+        "video_id":       video["video_id"],
+        "channel_id":     video["channel_id"],
+        "channel_name":   video["channel_name"],
+        "title":          video["title"],
+        "published_at":   video["published_at"],
+        "thumbnail_path": thumb_str,
+        "transcript":     json.dumps(summary),
+    }
+    if not dry_run:
+        save_episode(episode)
+    posts = []
+
+    reddit_slot = scheduler.add_stagger(x_slot, reddit_stagger)
+
+    # Generate X post (from summary, not raw transcript)
+    print("  Generating X thread...")
+    x_content = post_generator.generate_x_post(
+        channel_name=video["channel_name"],
+        episode_title=video["title"],
+        summary=summary,
+    )
+    if x_content and not dry_run:
+        posts.append({
+            "video_id":       video["video_id"],
+            "platform":       "x",
+            "content":        x_content,
+            "thumbnail_path": thumb_str,
+            "scheduled_at":   x_slot,
+            "auto_approve":   auto_post,
+        })
+        print(f"  X post queued → {x_slot} UTC")
+    elif x_content and dry_run:
+        print(f"  [DRY_RUN] X thread:")
+        for j, tweet in enumerate(x_content.get("tweets", []), 1):
+            print(f"    [{j}] {tweet}")
+
+    # Reddit post generation disabled — uncomment to re-enable
+    # if reddit_poster.is_configured():
+    #     print("  Generating Reddit post...")
+    #     reddit_content = post_generator.generate_reddit_post(
+    #         channel_name=video["channel_name"],
+    #         episode_title=video["title"],
+    #         summary=summary,
+    #         topic_tags=video.get("topic_tags", []),
+    #     )
+    #     if reddit_content and not dry_run:
+    #         posts.append({
+    #             "video_id":       video["video_id"],
+    #             "platform":       "reddit",
+    #             "content":        reddit_content,
+    #             "thumbnail_path": thumb_str,
+    #             "scheduled_at":   reddit_slot,
+    #             "auto_approve":   auto_post,
+    #         })
+    #         print(f"  Reddit post queued → {reddit_slot} UTC")
+    #     elif reddit_content and dry_run:
+    #         print(f"  [DRY_RUN] Reddit post:")
+    #         print(f"    Title: {reddit_content.get('title', '')}")
+    #         print(f"    Subreddits: {', '.join(reddit_content.get('suggested_subreddits', []))}")
+
+    return posts
+
+
 def cmd_discover():
     """Discover new episodes and generate posts."""
     print("\n=== Discovery run ===")
@@ -76,8 +259,11 @@ def cmd_discover():
     new_videos = youtube_monitor.check_channels(channels)
     print(f"Total new videos found: {len(new_videos)}")
 
-    # 2. Filter already-processed
-    unprocessed = [v for v in new_videos if not db.is_episode_processed(v["video_id"])]
+    # 2. Filter already-processed (one query), and videos listed by two channels
+    processed = db.processed_video_ids(v["video_id"] for v in new_videos)
+    unprocessed = list({
+        v["video_id"]: v for v in new_videos if v["video_id"] not in processed
+    }.values())
     print(f"Unprocessed: {len(unprocessed)}")
 
     if not unprocessed:
@@ -91,98 +277,63 @@ def cmd_discover():
     )
     reddit_stagger = schedule_cfg.get("reddit_stagger_minutes", 30)
 
-    # 4. Process each video
-    for i, video in enumerate(unprocessed):
-        print(f"\n[{i+1}/{len(unprocessed)}] {video['title']}")
-
-        # Transcript
-        transcript = transcript_extractor.get_transcript(video["video_id"])
-        if not transcript:
-            print("  No transcript — falling back to description")
-            transcript = video.get("description", "").strip()
-        if not transcript:
-            print("  No content available, skipping")
-            continue
-
-        # Thumbnail
-        thumbnail_path = thumbnail_fetcher.download_thumbnail(
-            video["video_id"], video["title"]
-        )
-        thumb_str = str(thumbnail_path) if thumbnail_path else None
-
-        # Summarise the full episode (one API call, shared by both posts)
-        print("  Summarising episode...")
-        summary = post_generator.summarize_episode(
-            channel_name=video["channel_name"],
-            episode_title=video["title"],
-            transcript=transcript,
-        )
-        if not summary:
-            print("  Summarisation failed, skipping")
-            continue
-
-        # Save episode record (store the clean summary, not the raw transcript)
-        import json as _json
-        summary_text = _json.dumps(summary)
-        if not dry_run:
-            db.save_episode(
-                video_id=video["video_id"],
-                channel_id=video["channel_id"],
-                channel_name=video["channel_name"],
-                title=video["title"],
-                published_at=video["published_at"],
-                thumbnail_path=thumb_str,
-                transcript=summary_text,
+    # 4. Process videos concurrently, saving episodes and posts in batches.
+    #    Slots are assigned by position in `unprocessed`, not completion order.
+    #    Workers queue each episode as soon as it is summarised; its posts
+    #    follow once generated, and a batch always writes episodes first.
+    workers = max(1, int(os.getenv("DISCOVER_WORKERS", DEFAULT_DISCOVER_WORKERS)))
+    print(f"Processing with {workers} worker(s)...")
+    output = _EpisodeOutput.install() if workers > 1 else None
+    pending_lock = threading.Lock()
+    pending_episodes, pending_posts = [], []
+
+    def queue_episode(episode: dict):
+        with pending_lock:
+            pending_episodes.append(episode)
+
+    def flush():
+        with pending_lock:
+            episodes, posts = pending_episodes[:], pending_posts[:]
+            pending_episodes.clear()
+            pending_posts.clear()
+        if not episodes and not posts:
+            return
+        with db.transaction():
+            db.save_episodes(episodes)
+            db.save_posts(posts)
+        print(f"  Saved {len(episodes)} episode(s), {len(posts)} post(s)")
+
+    def run(i: int, video: dict):
+        with output.captured() if output else nullcontext():
+            return process_video(
+                video, f"[{i+1}/{len(unprocessed)}]",
+                x_slot=x_slots[i],
+                reddit_stagger=reddit_stagger,
+                save_episode=queue_episode,
+                auto_post=auto_post,
+                dry_run=dry_run,
             )
 
-        x_slot      = x_slots[i]
-        reddit_slot = scheduler.add_stagger(x_slot, reddit_stagger)
-
-        # Generate X post (from summary, not raw transcript)
-        print("  Generating X thread...")
-        x_content = post_generator.generate_x_post(
-            channel_name=video["channel_name"],
-            episode_title=video["title"],
-            summary=summary,
-        )
-        if x_content and not dry_run:
-            db.save_post(
-                video_id=video["video_id"],
-                platform="x",
-                content=x_content,
-                thumbnail_path=thumb_str,
-                scheduled_at=x_slot,
-                auto_approve=auto_post,
-            )
-            print(f"  X post queued → {x_slot} UTC")
-        elif x_content and dry_run:
-            print(f"  [DRY_RUN] X thread:")
-            for j, tweet in enumerate(x_content.get("tweets", []), 1):
-                print(f"    [{j}] {tweet}")
-
-        # Reddit post generation disabled — uncomment to re-enable
-        # if reddit_poster.is_configured():
-        #     print("  Generating Reddit post...")
-        #     reddit_content = post_generator.generate_reddit_post(
-        #         channel_name=video["channel_name"],
-        #         episode_title=video["title"],
-        #         summary=summary,
-        #         topic_tags=video.get("topic_tags", []),
-        #     )
-        #     if reddit_content and not dry_run:
-        #         db.save_post(
-        #             video_id=video["video_id"],
-        #             platform="reddit",
-        #             content=reddit_content,
-        #             thumbnail_path=thumb_str,
-        #             scheduled_at=reddit_slot,
-        #             auto_approve=auto_post,
-        #         )
-        #         print(f"  Reddit post queued → {reddit_slot} UTC")
-        #     elif reddit_content and dry_run:
-        #         print(f"  [DRY_RUN] Reddit post:")
-        #         print(f"    Title: {reddit_content.get('title', '')}")
-        #         print(f"    Subreddits: {', '.join(reddit_content.get('suggested_subreddits', []))}")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run, i, v): (i, v) for i, v in enumerate(unprocessed)}
+            for future in as_completed(futures):
+                try:
+                    posts = future.result()
+                except Exception as e:
+                    i, video = futures[future]
+                    print(f"\n[{i+1}/{len(unprocessed)}] ✗ {video['title']}: {e}")
+                    posts = []
+                with pending_lock:
+                    pending_posts.extend(posts)
+                    full = len(pending_episodes) >= DB_BATCH_SIZE
+                if full:
+                    flush()
+    finally:
+        # Also on a crash, so finished episodes aren't re-summarised next run
+        flush()
+        if output:
+            output.uninstall()
 
     print("\n=== Discovery complete ===")
     if not auto_post and not dry_run:
@@ -190,23 +341,31 @@ def cmd_discover():
 
 
 def cmd_post():
-    """Post any approved content that is currently due."""
+    """Post any approved content that is currently due.
+
+    Posts are claimed one at a time (see db.claim_due_posts), so
+    POST_WORKERS threads here, or overlapping runs from cron and a manual
+    dispatch, share the queue without ever posting the same row twice.
+    Posts a crashed run left in 'posting' are retried once they have been
+    claimed for longer than POST_CLAIM_TIMEOUT_MINUTES.
+    """
     print("\n=== Posting run ===")
     db.init_db()
 
     _, subreddits_cfg, _ = load_config()
-    due = db.get_due_posts()
-
-    if not due:
-        print("No posts due right now.")
-        return
-
-    print(f"Found {len(due)} post(s) due")
-
-    for post in due:
+    workers = max(1, int(os.getenv("POST_WORKERS", "1")))
+    platforms = ["x"]
+    if reddit_poster.is_configured():
+        platforms.append("reddit")
+    else:
+        print("Reddit not configured — Reddit posts stay queued")
+
+    def publish(post: dict) -> bool:
         content = json.loads(post["content"])
         platform = post["platform"].upper()
         print(f"\n  Posting {platform}: {post['episode_title']}")
+        if post["claimed_from"] == "posting":
+            print("  ⚠ Retrying a post a crashed run left unfinished — check it isn't already live")
 
         try:
             if post["platform"] == "x":
@@ -216,12 +375,9 @@ def cmd_post():
                     video_id=post["video_id"],
                 )
                 db.update_post_status(post["id"], "posted", post_url=url)
-                print(f"  ✓ Posted: {url}")
+                print(f"  ✓ Posted {platform}: {url}")
 
             elif post["platform"] == "reddit":
-                if not reddit_poster.is_configured():
-                    print("  Reddit not configured — skipping")
-                    continue
                 urls = reddit_poster.post_to_subreddits(
                     title=content["title"],
                     body=content["body"],
@@ -232,12 +388,28 @@ def cmd_post():
                     post["id"], "posted", post_url=",".join(urls)
                 )
                 print(f"  ✓ Posted to: {', '.join(urls)}")
+            return True
 
         except Exception as e:
             db.update_post_status(post["id"], "failed", error=str(e))
-            print(f"  ✗ FAILED: {e}")
+            print(f"  ✗ FAILED ({platform}: {post['episode_title']}): {e}")
+            return False
+
+    def worker() -> list[bool]:
+        results = []
+        while claimed := db.claim_due_posts(limit=1, platforms=platforms):
+            results.append(publish(claimed[0]))
+        return results
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = [r for batch in pool.map(lambda _: worker(), range(workers)) for r in batch]
+
+    if not results:
+        print("No posts due right now.")
+        return
 
-    print("\n=== Posting run complete ===")
+    print(f"\n=== Posting run complete: {results.count(True)} posted, "
+          f"{results.count(False)} failed ===")
 
 
 def cmd_review():
@@ -275,4 +447,10 @@ if __name__ == "__main__":
         print(__doc__)
         sys.exit(1)
 
-    COMMANDS[sys.argv[1]]()
+    try:
+        COMMANDS[sys.argv[1]]()
+    finally:
+        db.close_pool()
+        print(db.stats_summary())
+        if cache_line := post_generator.cache_summary():
+            print(cache_line)
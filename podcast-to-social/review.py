@@ -12,6 +12,7 @@ When AUTO_POST=true, all posts skip review and this file is not used.
 """
 import json
 import sys
+from datetime import timezone
 from pathlib import Path
 
 from rich.console import Console
@@ -66,7 +67,7 @@ def _render_episode_header(post: dict, index: int, total: int):
     table.add_row("Episode",  post["episode_title"])
     table.add_row("Channel",  post["channel_name"])
     table.add_row("Platform", post["platform"].upper())
-    table.add_row("Scheduled", post["scheduled_at"] + " UTC")
+    table.add_row("Scheduled", f"{post['scheduled_at'].astimezone(timezone.utc):%Y-%m-%d %H:%M} UTC")
     if post.get("thumbnail_path"):
         table.add_row("Thumbnail", post["thumbnail_path"])
     console.print(table)
@@ -3,186 +3,324 @@ PostgreSQL database layer (Supabase).
 Tracks processed episodes and post queue (pending → approved → posted).
 
 Connection is configured via DATABASE_URL environment variable.
+
+Connections come from one process-wide pool (DB_POOL_SIZE, default 4), so a
+command pays the TLS handshake to Supabase once per connection instead of
+once per query. Every helper runs in a transaction(); helpers called inside
+an outer transaction() on the same thread join it. stats_summary() reports
+how many connections a run opened and how long connecting took.
 """
 import os
 import json
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Iterable
 
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
+import psycopg2.pool
+
+DEFAULT_POOL_SIZE = 4
+
+# Minutes a post may sit in 'posting' before claim_due_posts() takes it back
+DEFAULT_CLAIM_TIMEOUT_MINUTES = 30
+
+_pool = None
+_slots = None  # one per pooled connection; the pool itself raises when exhausted
+_pool_lock = threading.Lock()
+_local = threading.local()
+_stats = {"connections": 0, "connect_seconds": 0.0, "transactions": 0}
+
+
+class _TimedConnection(psycopg2.extensions.connection):
+    """Counts every new server connection and the time spent opening it."""
+
+    def __init__(self, *args, **kwargs):
+        start = time.perf_counter()
+        super().__init__(*args, **kwargs)
+        with _pool_lock:
+            _stats["connections"] += 1
+            _stats["connect_seconds"] += time.perf_counter() - start
+
+
+def _get_pool() -> tuple[psycopg2.pool.ThreadedConnectionPool, threading.Semaphore]:
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            size = max(1, int(os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE)))
+            _pool = psycopg2.pool.ThreadedConnectionPool(
+                0, size, os.environ["DATABASE_URL"],
+                connection_factory=_TimedConnection,
+                keepalives=1, keepalives_idle=30,
+            )
+            _slots = threading.Semaphore(size)
+        return _pool, _slots
+
+
+@contextmanager
+def transaction():
+    """A pooled connection inside one transaction: committed on success,
+    rolled back on error. Nested calls on the same thread reuse it; threads
+    beyond DB_POOL_SIZE wait for a free connection."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+
+    pool, slots = _get_pool()
+    with slots:
+        conn = pool.getconn()
+        _local.conn = conn
+        try:
+            with conn:
+                yield conn
+        finally:
+            _local.conn = None
+            with _pool_lock:
+                _stats["transactions"] += 1
+            # A connection the server dropped is discarded rather than reused
+            pool.putconn(conn, close=bool(conn.closed))
+
+
+@contextmanager
+def cursor(dict_rows: bool = False):
+    """A cursor in its own (or the surrounding) transaction."""
+    factory = psycopg2.extras.RealDictCursor if dict_rows else None
+    with transaction() as conn:
+        with conn.cursor(cursor_factory=factory) as cur:
+            yield cur
+
+
+def close_pool():
+    """Close every pooled connection (end of a command)."""
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = _slots = None
+
 
+def pool_stats() -> dict:
+    with _pool_lock:
+        return dict(_stats)
 
-def get_connection():
-    return psycopg2.connect(os.environ["DATABASE_URL"])
+
+def stats_summary() -> str:
+    stats = pool_stats()
+    return (f"DB: {stats['transactions']} transaction(s) over {stats['connections']} "
+            f"connection(s), {stats['connect_seconds']:.2f}s connecting")
 
 
 def init_db():
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS episodes (
-                        video_id       TEXT PRIMARY KEY,
-                        channel_id     TEXT NOT NULL,
-                        channel_name   TEXT NOT NULL,
-                        title          TEXT NOT NULL,
-                        published_at   TEXT NOT NULL,
-                        thumbnail_path TEXT,
-                        transcript     TEXT,
-                        processed_at   TEXT NOT NULL
-                    )
-                """)
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS posts (
-                        id             SERIAL PRIMARY KEY,
-                        video_id       TEXT NOT NULL,
-                        platform       TEXT NOT NULL,
-                        content        TEXT NOT NULL,
-                        thumbnail_path TEXT,
-                        scheduled_at   TEXT NOT NULL,
-                        status         TEXT NOT NULL DEFAULT 'pending',
-                        posted_at      TEXT,
-                        post_url       TEXT,
-                        error          TEXT,
-                        created_at     TEXT NOT NULL,
-                        FOREIGN KEY (video_id) REFERENCES episodes(video_id)
-                    )
-                """)
-                cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_posts_status
-                    ON posts(status)
-                """)
-                cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_posts_scheduled
-                    ON posts(scheduled_at)
-                """)
-    finally:
-        conn.close()
+    with cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS episodes (
+                video_id       TEXT PRIMARY KEY,
+                channel_id     TEXT NOT NULL,
+                channel_name   TEXT NOT NULL,
+                title          TEXT NOT NULL,
+                published_at   TEXT NOT NULL,
+                thumbnail_path TEXT,
+                transcript     TEXT,
+                processed_at   TEXT NOT NULL
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                id             SERIAL PRIMARY KEY,
+                video_id       TEXT NOT NULL,
+                platform       TEXT NOT NULL,
+                content        TEXT NOT NULL,
+                thumbnail_path TEXT,
+                scheduled_at   TIMESTAMPTZ NOT NULL,
+                status         TEXT NOT NULL DEFAULT 'pending',
+                posted_at      TIMESTAMPTZ,
+                post_url       TEXT,
+                error          TEXT,
+                created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+                claimed_at     TIMESTAMPTZ,
+                FOREIGN KEY (video_id) REFERENCES episodes(video_id)
+            )
+        """)
+        _migrate_post_timestamps(cur)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_status
+            ON posts(status)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_scheduled
+            ON posts(scheduled_at)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_due
+            ON posts(scheduled_at) WHERE status = 'approved'
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_claimed
+            ON posts(claimed_at) WHERE status = 'posting'
+        """)
+
+
+def _migrate_post_timestamps(cur):
+    """Convert posts tables created with TEXT timestamps to TIMESTAMPTZ.
+    Every stored value was written as UTC, with or without a trailing Z."""
+    cur.execute("ALTER TABLE posts ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ")
+    cur.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE  table_schema = current_schema() AND table_name = 'posts'
+          AND  column_name IN ('scheduled_at', 'posted_at', 'created_at')
+          AND  data_type = 'text'
+        """
+    )
+    columns = [row[0] for row in cur.fetchall()]
+    if not columns:
+        return
+    cur.execute(
+        "ALTER TABLE posts "
+        + ", ".join(
+            f"ALTER COLUMN {c} TYPE TIMESTAMPTZ USING ({c}::timestamp AT TIME ZONE 'UTC')"
+            for c in columns
+        )
+    )
+    if "created_at" in columns:
+        cur.execute("ALTER TABLE posts ALTER COLUMN created_at SET DEFAULT now()")
 
 
 # ── Episode helpers ────────────────────────────────────────────────────────────
 
-def is_episode_processed(video_id: str) -> bool:
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT 1 FROM episodes WHERE video_id = %s", (video_id,)
-                )
-                return cur.fetchone() is not None
-    finally:
-        conn.close()
-
-
-def save_episode(
-    video_id: str,
-    channel_id: str,
-    channel_name: str,
-    title: str,
-    published_at: str,
-    thumbnail_path: str = None,
-    transcript: str = None,
-):
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO episodes
-                      (video_id, channel_id, channel_name, title, published_at,
-                       thumbnail_path, transcript, processed_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (video_id) DO UPDATE SET
-                      channel_id     = EXCLUDED.channel_id,
-                      channel_name   = EXCLUDED.channel_name,
-                      title          = EXCLUDED.title,
-                      published_at   = EXCLUDED.published_at,
-                      thumbnail_path = EXCLUDED.thumbnail_path,
-                      transcript     = EXCLUDED.transcript,
-                      processed_at   = EXCLUDED.processed_at
-                    """,
-                    (
-                        video_id, channel_id, channel_name, title, published_at,
-                        thumbnail_path, transcript, datetime.utcnow().isoformat(),
-                    ),
-                )
-    finally:
-        conn.close()
+def processed_video_ids(video_ids: Iterable[str]) -> set[str]:
+    """The subset of `video_ids` already in the episodes table, in one query."""
+    video_ids = list(video_ids)
+    if not video_ids:
+        return set()
+    with cursor() as cur:
+        cur.execute(
+            "SELECT video_id FROM episodes WHERE video_id = ANY(%s)", (video_ids,)
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+def save_episodes(episodes: list[dict]):
+    """Upsert many episodes in one statement. Each dict has video_id, channel_id,
+    channel_name, title, published_at and optionally thumbnail_path, transcript."""
+    processed_at = datetime.utcnow().isoformat()
+    # ON CONFLICT can't touch the same row twice in one statement; last one wins
+    rows = {
+        e["video_id"]: (
+            e["video_id"], e["channel_id"], e["channel_name"], e["title"], e["published_at"],
+            e.get("thumbnail_path"), e.get("transcript"), processed_at,
+        )
+        for e in episodes
+    }
+    if not rows:
+        return
+    with cursor() as cur:
+        psycopg2.extras.execute_values(
+            cur,
+            """
+            INSERT INTO episodes
+              (video_id, channel_id, channel_name, title, published_at,
+               thumbnail_path, transcript, processed_at)
+            VALUES %s
+            ON CONFLICT (video_id) DO UPDATE SET
+              channel_id     = EXCLUDED.channel_id,
+              channel_name   = EXCLUDED.channel_name,
+              title          = EXCLUDED.title,
+              published_at   = EXCLUDED.published_at,
+              thumbnail_path = EXCLUDED.thumbnail_path,
+              transcript     = EXCLUDED.transcript,
+              processed_at   = EXCLUDED.processed_at
+            """,
+            list(rows.values()),
+        )
 
 
 # ── Post helpers ───────────────────────────────────────────────────────────────
 
-def save_post(
-    video_id: str,
-    platform: str,
-    content: dict,
-    thumbnail_path: str,
-    scheduled_at: str,
-    auto_approve: bool = False,
-):
-    status = "approved" if auto_approve else "pending"
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO posts
-                      (video_id, platform, content, thumbnail_path,
-                       scheduled_at, status, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        video_id, platform, json.dumps(content), thumbnail_path,
-                        scheduled_at, status, datetime.utcnow().isoformat(),
-                    ),
+def save_posts(posts: list[dict]):
+    """Insert many posts in one statement. Each dict has video_id, platform,
+    content, thumbnail_path, scheduled_at and optionally auto_approve."""
+    if not posts:
+        return
+    with cursor() as cur:
+        psycopg2.extras.execute_values(
+            cur,
+            """
+            INSERT INTO posts
+              (video_id, platform, content, thumbnail_path,
+               scheduled_at, status)
+            VALUES %s
+            """,
+            [
+                (
+                    p["video_id"], p["platform"], json.dumps(p["content"]), p["thumbnail_path"],
+                    p["scheduled_at"], "approved" if p.get("auto_approve") else "pending",
                 )
-    finally:
-        conn.close()
+                for p in posts
+            ],
+        )
 
 
 def get_pending_posts() -> list[dict]:
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT p.*, e.title AS episode_title, e.channel_name
-                    FROM   posts p
-                    JOIN   episodes e ON p.video_id = e.video_id
-                    WHERE  p.status = 'pending'
-                    ORDER  BY p.scheduled_at ASC
-                    """
-                )
-                return [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
-
-
-def get_due_posts() -> list[dict]:
-    """Approved posts whose scheduled time is now or in the past."""
-    now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT p.*, e.title AS episode_title, e.channel_name
-                    FROM   posts p
-                    JOIN   episodes e ON p.video_id = e.video_id
-                    WHERE  p.status = 'approved' AND p.scheduled_at <= %s
-                    ORDER  BY p.scheduled_at ASC
-                    """,
-                    (now,),
-                )
-                return [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    with cursor(dict_rows=True) as cur:
+        cur.execute(
+            """
+            SELECT p.*, e.title AS episode_title, e.channel_name
+            FROM   posts p
+            JOIN   episodes e ON p.video_id = e.video_id
+            WHERE  p.status = 'pending'
+            ORDER  BY p.scheduled_at ASC
+            """
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+
+def claim_due_posts(
+    limit: int = 1,
+    platforms: list[str] = None,
+    stale_after_minutes: float = None,
+) -> list[dict]:
+    """Atomically move up to `limit` due posts (on `platforms`, default all)
+    to 'posting' and return them. Rows another worker holds are skipped, not
+    waited on, so any number of overlapping `main.py post` runs never get the
+    same post.
+
+    A claimed post must end in update_post_status(): 'posted', 'failed', or
+    'approved' to hand it back. A post still in 'posting' more than
+    `stale_after_minutes` (POST_CLAIM_TIMEOUT_MINUTES, default 30) after it
+    was claimed belongs to a worker that died, and is claimed again; such
+    rows come back with claimed_from = 'posting'. The timeout must stay well
+    above the longest publish, or a slow post could go out twice.
+    """
+    if stale_after_minutes is None:
+        stale_after_minutes = float(os.getenv("POST_CLAIM_TIMEOUT_MINUTES", DEFAULT_CLAIM_TIMEOUT_MINUTES))
+    with cursor(dict_rows=True) as cur:
+        cur.execute(
+            """
+            WITH due AS (
+                SELECT id, status
+                FROM   posts
+                WHERE  ((status = 'approved' AND scheduled_at <= now())
+                        OR (status = 'posting'
+                            AND claimed_at < now() - make_interval(secs => %s)))
+                  AND  (%s::text[] IS NULL OR platform = ANY(%s::text[]))
+                ORDER  BY scheduled_at ASC
+                LIMIT  %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE posts p
+            SET    status = 'posting', claimed_at = now()
+            FROM   due, episodes e
+            WHERE  p.id = due.id AND e.video_id = p.video_id
+            RETURNING p.*, due.status AS claimed_from, e.title AS episode_title, e.channel_name
+            """,
+            (stale_after_minutes * 60, platforms, platforms, limit),
+        )
+        return sorted((dict(r) for r in cur.fetchall()), key=lambda r: r["scheduled_at"])
 
 
 def update_post_status(
@@ -191,21 +329,16 @@ def update_post_status(
     post_url: str = None,
     error: str = None,
 ):
-    posted_at = datetime.utcnow().isoformat() if status == "posted" else None
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    UPDATE posts
-                    SET    status = %s, post_url = %s, error = %s, posted_at = %s
-                    WHERE  id = %s
-                    """,
-                    (status, post_url, error, posted_at, post_id),
-                )
-    finally:
-        conn.close()
+    with cursor() as cur:
+        cur.execute(
+            """
+            UPDATE posts
+            SET    status = %s, post_url = %s, error = %s,
+                   posted_at = CASE WHEN %s = 'posted' THEN now() END
+            WHERE  id = %s
+            """,
+            (status, post_url, error, status, post_id),
+        )
 
 
 def approve_post(post_id: int):
@@ -217,19 +350,14 @@ def reject_post(post_id: int):
 
 
 def get_today_summary() -> list[dict]:
-    conn = get_connection()
-    try:
-        with conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT platform, status, COUNT(*) AS count
-                    FROM   posts
-                    WHERE  created_at::date = CURRENT_DATE
-                    GROUP  BY platform, status
-                    ORDER  BY platform, status
-                    """
-                )
-                return [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    with cursor(dict_rows=True) as cur:
+        cur.execute(
+            """
+            SELECT platform, status, COUNT(*) AS count
+            FROM   posts
+            WHERE  created_at::date = CURRENT_DATE
+            GROUP  BY platform, status
+            ORDER  BY platform, status
+            """
+        )
+        return [dict(r) for r in cur.fetchall()]
@@ -0,0 +1,241 @@
+"""
+Persistent cache of LLM responses, keyed by a hash of the request.
+
+Re-running discovery after a crash or re-generating a post sends prompts
+that were already answered; those come back from the cache instead of
+being paid for again. The key covers everything that determines the
+response: model, max_tokens, response_format and the full prompt.
+
+Stores:
+  sqlite    a local file (default)
+  postgres  an llm_cache table in DATABASE_URL, shared by every machine
+
+Environment:
+  LLM_CACHE=sqlite          sqlite | postgres | off
+  LLM_CACHE_PATH            SQLite file (default: data/llm_cache.sqlite3)
+  LLM_CACHE_TTL_HOURS=720   Entries older than this are ignored; 0 = never expire
+  LLM_CACHE_MAX_ENTRIES=5000  Least recently used entries beyond this are evicted
+  LLM_CACHE_BYPASS=false    'true' skips lookups but still stores fresh responses
+
+Stdlib only, so other projects can import it by putting this directory on
+sys.path. The postgres store runs its queries through a `cursor` context
+manager the caller passes in (database.cursor here), so it shares that
+project's connections rather than opening its own.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_STORES = ["sqlite", "postgres", "off"]
+DEFAULT_TTL_HOURS = 720
+DEFAULT_MAX_ENTRIES = 5000
+
+# Expired and over-cap entries are cleared on the first put, then every N puts
+EVICT_EVERY = 100
+
+
+def cache_key(model: str, max_tokens: int, response_format: dict | None, prompt: str) -> str:
+    request = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "response_format": response_format,
+        "prompt": hashlib.sha256(prompt.encode()).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+# ── Stores ─────────────────────────────────────────────────────────────────────
+
+class _SQLiteStore:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key        TEXT PRIMARY KEY,
+                response   TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                used_at    REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_used ON llm_cache(used_at)")
+
+    def get(self, key: str, oldest: float) -> str | None:
+        row = self._conn.execute(
+            "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?", (key, oldest)
+        ).fetchone()
+        if row:
+            self._conn.execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, response, created_at, used_at) VALUES (?, ?, ?, ?)",
+            (key, response, now, now),
+        )
+
+    def evict(self, oldest: float, max_entries: int) -> int:
+        removed = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (oldest,)).rowcount
+        removed += self._conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_entries,),
+        ).rowcount
+        return removed
+
+
+class _PostgresStore:
+    """llm_cache table in the caller's database; `cursor()` yields a cursor
+    inside a transaction (e.g. database.cursor)."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._ready = False
+
+    def _cur(self):
+        if not self._ready:
+            with self._cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key        TEXT PRIMARY KEY,
+                        response   TEXT NOT NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        used_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                """)
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_used ON llm_cache(used_at)")
+            self._ready = True
+        return self._cursor()
+
+    def get(self, key: str, oldest: float) -> str | None:
+        with self._cur() as cur:
+            cur.execute(
+                """
+                UPDATE llm_cache SET used_at = now()
+                WHERE  key = %s AND created_at >= to_timestamp(%s)
+                RETURNING response
+                """,
+                (key, oldest),
+            )
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str):
+        with self._cur() as cur:
+            cur.execute(
+                """
+                INSERT INTO llm_cache (key, response) VALUES (%s, %s)
+                ON CONFLICT (key) DO UPDATE SET
+                  response = EXCLUDED.response, created_at = now(), used_at = now()
+                """,
+                (key, response),
+            )
+
+    def evict(self, oldest: float, max_entries: int) -> int:
+        with self._cur() as cur:
+            cur.execute("DELETE FROM llm_cache WHERE created_at < to_timestamp(%s)", (oldest,))
+            removed = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY used_at DESC OFFSET %s
+                )
+                """,
+                (max_entries,),
+            )
+            return removed + cur.rowcount
+
+
+# ── Cache ──────────────────────────────────────────────────────────────────────
+
+class LLMCache:
+    """
+    Thread-safe get/put of LLM responses with a TTL and an LRU size cap.
+    `store` is None for a disabled cache: every lookup misses, nothing is kept.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        bypass: bool = False,
+    ):
+        self._store = store
+        self.ttl = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    key = staticmethod(cache_key)
+
+    @classmethod
+    def from_env(cls, default_path: Path, cursor=None) -> "LLMCache":
+        """`cursor` is the database's cursor() context manager, required for
+        LLM_CACHE=postgres."""
+        kind = os.getenv("LLM_CACHE", "sqlite").lower()
+        if kind not in CACHE_STORES:
+            raise ValueError(f"LLM_CACHE must be one of {CACHE_STORES}, got {kind!r}")
+        if kind == "sqlite":
+            store = _SQLiteStore(Path(os.getenv("LLM_CACHE_PATH", default_path)))
+        elif kind == "postgres":
+            if cursor is None:
+                raise ValueError("LLM_CACHE=postgres needs a database cursor")
+            store = _PostgresStore(cursor)
+        else:
+            store = None
+        return cls(
+            store,
+            ttl_hours=float(os.getenv("LLM_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            bypass=os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true",
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._store is not None
+
+    @property
+    def used(self) -> bool:
+        """True once anything was looked up or stored."""
+        return any(self.stats.values())
+
+    def _oldest(self) -> float:
+        return time.time() - self.ttl if self.ttl > 0 else 0.0
+
+    def get(self, key: str) -> str | None:
+        if self._store is None or self.bypass:
+            return None
+        with self._lock:
+            response = self._store.get(key, self._oldest())
+            self.stats["hits" if response is not None else "misses"] += 1
+        return response
+
+    def put(self, key: str, response: str):
+        if self._store is None:
+            return
+        with self._lock:
+            self._store.put(key, response)
+            self.stats["stored"] += 1
+            if self._puts % EVICT_EVERY == 0:
+                self.stats["evicted"] += self._store.evict(self._oldest(), self.max_entries)
+            self._puts += 1
+
+    def summary(self) -> str:
+        if self._store is None:
+            return "LLM cache: off"
+        s = self.stats
+        mode = " (bypass)" if self.bypass else ""
+        return (f"LLM cache{mode}: {s['hits']} hit(s), {s['misses']} miss(es), "
+                f"{s['stored']} stored, {s['evicted']} evicted")
@@ -7,8 +7,12 @@ Pipeline per episode:
      so each chunk is understood in context of what came before
   3. synthesise ALL partial summaries into one structured JSON using gpt-4o
      (higher quality model — this output drives everything downstream)
+     SUMMARY_MODE=map-reduce instead summarises every chunk at once, each
+     with only the episode title for context, then runs the same synthesis
   4. generate_x_post()     — gpt-4o-mini, turns final summary into X thread
   5. generate_reddit_post() — gpt-4o-mini, turns final summary into Reddit post
+  Each step has an *_async twin that runs on a shared AsyncOpenAI client;
+  await aclose() once a loop is done with them.
 
 Speaking pace is ~130-150 words/min (~800 chars/min including spaces):
   1 hour  ≈  48,000 chars  →  2 chunks  →  3 API calls total
@@ -16,36 +20,183 @@ Speaking pace is ~130-150 words/min (~800 chars/min including spaces):
   3 hours ≈ 144,000 chars  →  4 chunks  →  5 API calls total
 All cheap gpt-4o-mini calls except the one synthesis step.
 """
+import asyncio
 import os
 import json
 import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from src import database
+from src.llm_cache import LLMCache
 
 PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+CACHE_FILE  = Path(__file__).parent.parent / "data" / "llm_cache.sqlite3"
 
 # ~800 chars/min of speech. A 40k chunk ≈ 50 minutes of audio.
 # gpt-4o-mini's 128k context easily holds a 40k chunk plus
 # accumulated previous summaries (~500 words / ~3k chars each).
 CHUNK_SIZE = 40_000
 
+# Concurrent requests across all episodes being processed (OPENAI_CONCURRENCY)
+_OPENAI_SLOTS = threading.Semaphore(int(os.getenv("OPENAI_CONCURRENCY", "4")))
+
+SUMMARY_MODES = ["rolling", "map-reduce"]
+
+# Running totals across every _call() in this process; see usage()
+_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+_usage_lock = threading.Lock()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Shared API clients, created on first use
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop → (AsyncOpenAI, Semaphore)
+
 
 # ── OpenAI helpers ─────────────────────────────────────────────────────────────
 
+def _http_limits() -> httpx.Limits:
+    # Enough keep-alive connections for every permitted concurrent request
+    slots = int(os.getenv("OPENAI_CONCURRENCY", "4"))
+    return httpx.Limits(
+        max_connections=slots * 2,
+        max_keepalive_connections=slots,
+        keepalive_expiry=60,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    # Synthesis of a long episode can take a while; connecting should not
+    return httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT", "120")), connect=10.0)
+
+
 def _get_client() -> OpenAI:
-    return OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+    """One client per process: its connection pool keeps TLS sessions to the
+    API warm across every call (and is safe to share between threads)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(
+                api_key=os.environ["OPENAI_API_KEY"],
+                max_retries=3,
+                timeout=_timeout(),
+                http_client=httpx.Client(limits=_http_limits(), timeout=_timeout()),
+            )
+        return _client
+
+
+def _get_async_client() -> tuple[AsyncOpenAI, asyncio.Semaphore]:
+    """The AsyncOpenAI client and request semaphore for the running event
+    loop. httpx async connections can't cross loops, so each loop gets its own."""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        client = AsyncOpenAI(
+            api_key=os.environ["OPENAI_API_KEY"],
+            max_retries=3,
+            timeout=_timeout(),
+            http_client=httpx.AsyncClient(limits=_http_limits(), timeout=_timeout()),
+        )
+        slots = asyncio.Semaphore(int(os.getenv("OPENAI_CONCURRENCY", "4")))
+        _async_clients[loop] = (client, slots)
+    return _async_clients[loop]
+
+
+async def aclose():
+    """Close the running loop's AsyncOpenAI client and its connection pool.
+    Await it before the loop finishes, e.g. at the end of the coroutine
+    passed to asyncio.run(), after the last *_async call."""
+    entry = _async_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].close()
+
+
+def get_cache() -> LLMCache:
+    """The process-wide response cache, configured from LLM_CACHE* env vars."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache.from_env(CACHE_FILE, cursor=database.cursor)
+        return _cache
+
+
+def cache_summary() -> str | None:
+    """The response cache's hit/miss line, or None if this process never used it."""
+    with _cache_lock:
+        if _cache is None or not _cache.used:
+            return None
+        return _cache.summary()
+
+
+def _request(prompt: str, model: str, max_tokens: int) -> tuple[str, dict]:
+    """Cache key and chat.completions.create() arguments (JSON mode forced on)."""
+    response_format = {"type": "json_object"}
+    key = get_cache().key(model, max_tokens, response_format, prompt)
+    return key, {
+        "model": model,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt}],
+        "response_format": response_format,
+    }
+
+
+def _record(response) -> tuple[str, bool]:
+    """Count a response's tokens; returns its text and whether it is worth
+    caching (only complete answers are replayed)."""
+    with _usage_lock:
+        _usage["calls"] += 1
+        if response.usage:
+            _usage["prompt_tokens"] += response.usage.prompt_tokens
+            _usage["completion_tokens"] += response.usage.completion_tokens
+    return response.choices[0].message.content, response.choices[0].finish_reason == "stop"
 
 
 def _call(prompt: str, model: str, max_tokens: int = 2000) -> str:
-    """Call OpenAI with JSON mode forced on."""
-    response = _get_client().chat.completions.create(
-        model=model,
-        max_tokens=max_tokens,
-        messages=[{"role": "user", "content": prompt}],
-        response_format={"type": "json_object"},
-    )
-    return response.choices[0].message.content
+    """Call OpenAI with JSON mode forced on. Identical requests are
+    answered from the response cache."""
+    key, request = _request(prompt, model, max_tokens)
+    cached = get_cache().get(key)
+    if cached is not None:
+        return cached
+
+    with _OPENAI_SLOTS:
+        response = _get_client().chat.completions.create(**request)
+    content, complete = _record(response)
+    if complete:
+        get_cache().put(key, content)
+    return content
+
+
+async def _acall(prompt: str, model: str, max_tokens: int = 2000) -> str:
+    """Async _call(), on the event loop's shared AsyncOpenAI client. Cache
+    lookups and writes (network round trips with LLM_CACHE=postgres) run
+    in a worker thread so they never block the loop."""
+    key, request = _request(prompt, model, max_tokens)
+    cache = get_cache()
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached
+
+    client, slots = _get_async_client()
+    async with slots:
+        response = await client.chat.completions.create(**request)
+    content, complete = _record(response)
+    if complete:
+        await asyncio.to_thread(cache.put, key, content)
+    return content
+
+
+def usage() -> dict:
+    """OpenAI calls and tokens used so far by this process."""
+    with _usage_lock:
+        return dict(_usage)
 
 
 def _extract_json(text: str) -> dict:
@@ -63,6 +214,10 @@ def _synthesis_model() -> str:
     return os.environ.get("OPENAI_SYNTHESIS_MODEL", "gpt-4o")
 
 
+def _summary_mode() -> str:
+    return os.environ.get("SUMMARY_MODE", "rolling")
+
+
 # ── Prompt templates ───────────────────────────────────────────────────────────
 
 _SINGLE_PASS_PROMPT = """\
@@ -112,6 +267,28 @@ Extract from THIS section only (do not repeat content already covered above):
 Return ONLY valid JSON: section_summary, key_points, notable_quotes
 """
 
+# map-reduce: every section is summarised independently, in parallel
+_MAP_CHUNK_PROMPT = """\
+You are summarising section {chunk_num} of {total_chunks} of a podcast transcript.
+Raw auto-generated captions — messy, no punctuation. Find the signal.
+The other sections are summarised separately and merged afterwards.
+
+Podcast: {channel_name}
+Episode: {episode_title}
+
+Section {chunk_num} of {total_chunks}:
+---
+{chunk}
+---
+
+Extract from this section:
+1. section_summary — 2-3 sentences on the main ideas in this section
+2. key_points      — 3-5 specific, concrete ideas from this section
+3. notable_quotes  — up to 2 verbatim memorable quotes. Empty list if none.
+
+Return ONLY valid JSON: section_summary, key_points, notable_quotes
+"""
+
 _SYNTHESIS_PROMPT = """\
 You are synthesising section-by-section summaries of a full podcast episode
 into one final structured analysis. Do not just repeat what's below — identify
@@ -227,23 +404,72 @@ def _summary_to_text(summary: dict) -> str:
 
 
 # ── Step 1: Summarise ─────────────────────────────────────────────────────────
+# Prompt building is shared by the sync and async versions below; they only
+# differ in how the calls are made.
 
-def summarize_episode(
-    channel_name: str,
-    episode_title: str,
-    transcript: str,
-) -> dict | None:
-    """
-    Summarise a full transcript into a structured insights dict.
+def _single_pass_prompt(channel_name: str, episode_title: str, transcript: str) -> str:
+    return _SINGLE_PASS_PROMPT.format(
+        channel_name=channel_name,
+        episode_title=episode_title,
+        transcript=transcript,
+    )
 
-    Short transcripts (≤ CHUNK_SIZE):
-      → single pass with the synthesis model (gpt-4o)
 
-    Long transcripts (> CHUNK_SIZE):
-      → rolling chunk summaries with gpt-4o-mini
-         each chunk receives all previous summaries as context
-      → final synthesis pass with gpt-4o
+def _rolling_prompt(
+    chunks: list[str], i: int, partial_summaries: list[dict],
+    channel_name: str, episode_title: str,
+) -> str:
+    return _CHUNK_PROMPT.format(
+        chunk_num=i + 1,
+        total_chunks=len(chunks),
+        channel_name=channel_name,
+        episode_title=episode_title,
+        previous_context=_format_previous_context(partial_summaries),
+        chunk=chunks[i],
+    )
+
+
+def _map_prompt(chunks: list[str], i: int, channel_name: str, episode_title: str) -> str:
+    return _MAP_CHUNK_PROMPT.format(
+        chunk_num=i + 1,
+        total_chunks=len(chunks),
+        channel_name=channel_name,
+        episode_title=episode_title,
+        chunk=chunks[i],
+    )
+
+
+def _synthesis_prompt(partial_summaries: list[dict], channel_name: str, episode_title: str) -> str:
+    return _SYNTHESIS_PROMPT.format(
+        channel_name=channel_name,
+        episode_title=episode_title,
+        all_summaries=_format_previous_context(partial_summaries),
+    )
+
+
+def _parse(result, what: str) -> dict | None:
+    """JSON from a response, or None (logged) if the call or the parse failed."""
+    try:
+        if isinstance(result, Exception):
+            raise result
+        return _extract_json(result)
+    except Exception as e:
+        print(f"    [generator] {what} error: {e}")
+        return None
+
+
+def _summary_steps(channel_name: str, episode_title: str, transcript: str, mode: str | None):
     """
+    The summarisation flow, written once for both the sync and async APIs.
+    A generator: it yields each batch of OpenAI requests it needs, as
+    (prompt, model, max_tokens) tuples to run together, is sent back their
+    responses (an exception in place of any that failed), and returns the
+    summary. summarize_episode() and summarize_episode_async() only differ
+    in how they run a batch.
+    """
+    mode = mode or _summary_mode()
+    if mode not in SUMMARY_MODES:
+        raise ValueError(f"Unknown summary mode {mode!r}, expected one of {SUMMARY_MODES}")
     chunks = _chunk_transcript(transcript)
     n = len(chunks)
     print(f"    [generator] Transcript: {len(transcript):,} chars → {n} chunk(s)")
@@ -251,38 +477,32 @@ def summarize_episode(
     # ── Short transcript: single high-quality pass ─────────────────────────
     if n == 1:
         print(f"    [generator] Single-pass summarisation ({_synthesis_model()})...")
-        prompt = _SINGLE_PASS_PROMPT.format(
-            channel_name=channel_name,
-            episode_title=episode_title,
-            transcript=transcript,
-        )
-        try:
-            response = _call(prompt, _synthesis_model(), max_tokens=1500)
-            return _extract_json(response)
-        except Exception as e:
-            print(f"    [generator] Summarisation error: {e}")
-            return None
+        prompt = _single_pass_prompt(channel_name, episode_title, transcript)
+        [result] = yield [(prompt, _synthesis_model(), 1500)]
+        return _parse(result, "Summarisation")
 
-    # ── Long transcript: rolling chunks ───────────────────────────────────
+    # ── Long transcript: chunk summaries ──────────────────────────────────
     partial_summaries: list[dict] = []
-
-    for i, chunk in enumerate(chunks):
-        print(f"    [generator] Chunk {i+1}/{n} ({_chunk_model()})...")
-        previous_context = _format_previous_context(partial_summaries)
-
-        prompt = _CHUNK_PROMPT.format(
-            chunk_num=i + 1,
-            total_chunks=n,
-            channel_name=channel_name,
-            episode_title=episode_title,
-            previous_context=previous_context,
-            chunk=chunk,
-        )
-        try:
-            response = _call(prompt, _chunk_model(), max_tokens=1000)
-            partial_summaries.append(_extract_json(response))
-        except Exception as e:
-            print(f"    [generator] Chunk {i+1} error: {e}")
+    if mode == "map-reduce":
+        # Every chunk at once, each knowing only the episode it is from
+        print(f"    [generator] Chunks 1-{n} in parallel ({_chunk_model()})...")
+        results = yield [
+            (_map_prompt(chunks, i, channel_name, episode_title), _chunk_model(), 1000)
+            for i in range(n)
+        ]
+        for i, result in enumerate(results):
+            section = _parse(result, f"Chunk {i+1}")
+            if section is not None:
+                partial_summaries.append(section)
+    else:
+        # One after another, each seeing every earlier summary
+        for i in range(n):
+            print(f"    [generator] Chunk {i+1}/{n} ({_chunk_model()})...")
+            prompt = _rolling_prompt(chunks, i, partial_summaries, channel_name, episode_title)
+            [result] = yield [(prompt, _chunk_model(), 1000)]
+            section = _parse(result, f"Chunk {i+1}")
+            if section is not None:
+                partial_summaries.append(section)
             # Keep going — partial coverage is better than nothing
 
     if not partial_summaries:
@@ -291,19 +511,73 @@ def summarize_episode(
 
     # ── Final synthesis: all partial summaries → structured output ─────────
     print(f"    [generator] Final synthesis ({_synthesis_model()})...")
-    all_summaries = _format_previous_context(partial_summaries)
+    prompt = _synthesis_prompt(partial_summaries, channel_name, episode_title)
+    [result] = yield [(prompt, _synthesis_model(), 2000)]
+    return _parse(result, "Synthesis")
 
-    prompt = _SYNTHESIS_PROMPT.format(
-        channel_name=channel_name,
-        episode_title=episode_title,
-        all_summaries=all_summaries,
-    )
+
+def _run_batch(requests: list[tuple]) -> list:
+    """Run a batch of _summary_steps() requests on threads."""
+    def call(request: tuple):
+        try:
+            return _call(*request)
+        except Exception as e:
+            return e
+
+    if len(requests) == 1:
+        return [call(requests[0])]
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        return list(pool.map(call, requests))
+
+
+async def _run_batch_async(requests: list[tuple]) -> list:
+    """Run a batch of _summary_steps() requests on the event loop."""
+    return await asyncio.gather(*(_acall(*request) for request in requests), return_exceptions=True)
+
+
+def summarize_episode(
+    channel_name: str,
+    episode_title: str,
+    transcript: str,
+    mode: str | None = None,
+) -> dict | None:
+    """
+    Summarise a full transcript into a structured insights dict.
+
+    Short transcripts (≤ CHUNK_SIZE):
+      → single pass with the synthesis model (gpt-4o)
+
+    Long transcripts (> CHUNK_SIZE), by `mode` (default: SUMMARY_MODE env):
+      rolling     → chunk summaries with gpt-4o-mini, one after another;
+                    each chunk receives all previous summaries as context
+      map-reduce  → all chunk summaries at once, without previous context
+      → final synthesis pass with gpt-4o
+    """
+    steps = _summary_steps(channel_name, episode_title, transcript, mode)
     try:
-        response = _call(prompt, _synthesis_model(), max_tokens=2000)
-        return _extract_json(response)
-    except Exception as e:
-        print(f"    [generator] Synthesis error: {e}")
-        return None
+        requests = next(steps)
+        while True:
+            requests = steps.send(_run_batch(requests))
+    except StopIteration as done:
+        return done.value
+
+
+async def summarize_episode_async(
+    channel_name: str,
+    episode_title: str,
+    transcript: str,
+    mode: str | None = None,
+) -> dict | None:
+    """summarize_episode() on the shared AsyncOpenAI client. Many episodes can
+    be summarised at once on one event loop; requests are still capped at
+    OPENAI_CONCURRENCY."""
+    steps = _summary_steps(channel_name, episode_title, transcript, mode)
+    try:
+        requests = next(steps)
+        while True:
+            requests = steps.send(await _run_batch_async(requests))
+    except StopIteration as done:
+        return done.value
 
 
 # ── Step 2: Generate posts ────────────────────────────────────────────────────
@@ -321,6 +595,27 @@ def _fill(template: str, **kwargs) -> str:
     return template
 
 
+def _x_post_prompt(channel_name: str, episode_title: str, summary: dict) -> str:
+    return _fill(
+        _load_prompt("x_post.md"),
+        channel_name=channel_name,
+        episode_title=episode_title,
+        transcript=_summary_to_text(summary),
+    )
+
+
+def _reddit_post_prompt(
+    channel_name: str, episode_title: str, summary: dict, topic_tags: list[str],
+) -> str:
+    return _fill(
+        _load_prompt("reddit_post.md"),
+        channel_name=channel_name,
+        episode_title=episode_title,
+        transcript=_summary_to_text(summary),
+        topic_tags=", ".join(topic_tags) if topic_tags else "general",
+    )
+
+
 def generate_x_post(
     channel_name: str,
     episode_title: str,
@@ -331,13 +626,7 @@ def generate_x_post(
     Returns a dict with key 'tweets' (list of str), or None on failure.
     """
     try:
-        template = _load_prompt("x_post.md")
-        prompt = _fill(
-            template,
-            channel_name=channel_name,
-            episode_title=episode_title,
-            transcript=_summary_to_text(summary),
-        )
+        prompt = _x_post_prompt(channel_name, episode_title, summary)
         response = _call(prompt, _chunk_model(), max_tokens=1500)
         return _extract_json(response)
     except Exception as e:
@@ -345,6 +634,20 @@ def generate_x_post(
         return None
 
 
+async def generate_x_post_async(
+    channel_name: str,
+    episode_title: str,
+    summary: dict,
+) -> dict | None:
+    """generate_x_post() on the shared AsyncOpenAI client."""
+    try:
+        prompt = _x_post_prompt(channel_name, episode_title, summary)
+        return _extract_json(await _acall(prompt, _chunk_model(), max_tokens=1500))
+    except Exception as e:
+        print(f"    [generator] X post error: {e}")
+        return None
+
+
 def generate_reddit_post(
     channel_name: str,
     episode_title: str,
@@ -356,16 +659,24 @@ def generate_reddit_post(
     Returns a dict with keys 'title', 'body', 'suggested_subreddits', or None.
     """
     try:
-        template = _load_prompt("reddit_post.md")
-        prompt = _fill(
-            template,
-            channel_name=channel_name,
-            episode_title=episode_title,
-            transcript=_summary_to_text(summary),
-            topic_tags=", ".join(topic_tags) if topic_tags else "general",
-        )
+        prompt = _reddit_post_prompt(channel_name, episode_title, summary, topic_tags)
         response = _call(prompt, _chunk_model(), max_tokens=2000)
         return _extract_json(response)
     except Exception as e:
         print(f"    [generator] Reddit post error: {e}")
         return None
+
+
+async def generate_reddit_post_async(
+    channel_name: str,
+    episode_title: str,
+    summary: dict,
+    topic_tags: list[str],
+) -> dict | None:
+    """generate_reddit_post() on the shared AsyncOpenAI client."""
+    try:
+        prompt = _reddit_post_prompt(channel_name, episode_title, summary, topic_tags)
+        return _extract_json(await _acall(prompt, _chunk_model(), max_tokens=2000))
+    except Exception as e:
+        print(f"    [generator] Reddit post error: {e}")
+        return None
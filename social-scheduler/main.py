@@ -13,7 +13,6 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 import time
 from datetime import datetime, timedelta
@@ -26,6 +25,10 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
 load_dotenv(Path(__file__).parent / ".env")
 
+CONTENT_DIR = Path(__file__).parent.parent / "mass-content-maker"
+sys.path.insert(0, str(CONTENT_DIR / "src"))
+
+from variations import default_source, iter_variations
 from src.database import load_posts, get_all_posts, update_post, reset_db, get_db
 from src.uploader import upload_file
 from src.publisher import (
@@ -40,8 +43,7 @@ from src.publisher import (
 
 console = Console()
 
-CONTENT_DIR = Path(__file__).parent.parent / "mass-content-maker"
-VARIATIONS_FILE = CONTENT_DIR / "variations.json"
+VARIATIONS_FILE = default_source(CONTENT_DIR)
 VIDEO_DIR = CONTENT_DIR / "output" / "videos"
 IMAGE_DIR = CONTENT_DIR / "output"
 
@@ -63,10 +65,7 @@ def cmd_load():
         console.print(f"[red]Not found:[/red] {VARIATIONS_FILE}")
         sys.exit(1)
 
-    with open(VARIATIONS_FILE) as f:
-        variations = json.load(f)
-
-    result = load_posts(variations, VIDEO_DIR, IMAGE_DIR)
+    result = load_posts(iter_variations(VARIATIONS_FILE), VIDEO_DIR, IMAGE_DIR)
     if result == -1:
         console.print("[yellow]Database already has posts. Use 'reset' first to reload.[/yellow]")
         return
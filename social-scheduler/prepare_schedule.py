@@ -1,5 +1,5 @@
 """
-Build schedule.json from variations.json and local video files.
+Build schedule.json from mass-content-maker's variations and local video files.
 Videos are uploaded to Litterbox at publish time by publish_next.py.
 
 Usage:
@@ -7,18 +7,20 @@ Usage:
 """
 
 import json
+import sys
 from pathlib import Path
 
 CONTENT_DIR = Path(__file__).parent.parent / "mass-content-maker"
-VARIATIONS_FILE = CONTENT_DIR / "variations.json"
+sys.path.insert(0, str(CONTENT_DIR / "src"))
+
+from variations import default_source, iter_variations
+
+VARIATIONS_FILE = default_source(CONTENT_DIR)
 VIDEO_DIR = Path(__file__).parent / "videos"
 SCHEDULE_FILE = Path(__file__).parent / "schedule.json"
 
 
 def main():
-    with open(VARIATIONS_FILE) as f:
-        variations = json.load(f)
-
     # Load existing schedule if resuming
     existing = {}
     if SCHEDULE_FILE.exists():
@@ -27,7 +29,7 @@ def main():
             existing = {p["index"]: p for p in data["posts"]}
 
     posts = []
-    for i, v in enumerate(variations):
+    for i, v in enumerate(iter_variations(VARIATIONS_FILE)):
         slug = v["metric"].lower().replace(" ", "-").replace("/", "-")
         video_file = VIDEO_DIR / f"{i:02d}-{slug}.mp4"
 
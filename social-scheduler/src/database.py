@@ -1,10 +1,15 @@
 """SQLite database for tracking social media posts."""
 
 import sqlite3
+from collections.abc import Iterable
 from pathlib import Path
 
 DB_PATH = Path(__file__).parent.parent / "scheduler.db"
 
+# mass-content-maker can write cards as jpeg, png or webp. Prefer jpeg (small,
+# and the only still format Instagram accepts); webp only when it's all there is.
+IMAGE_EXTENSIONS = [".jpg", ".png", ".webp"]
+
 
 def get_db() -> sqlite3.Connection:
     conn = sqlite3.connect(str(DB_PATH))
@@ -43,7 +48,7 @@ def _create_tables(conn: sqlite3.Connection):
     conn.commit()
 
 
-def load_posts(variations: list[dict], video_dir: Path, image_dir: Path) -> int:
+def load_posts(variations: Iterable[dict], video_dir: Path, image_dir: Path) -> int:
     """Load variations into the database, matching with video/image files."""
     conn = get_db()
 
@@ -57,7 +62,10 @@ def load_posts(variations: list[dict], video_dir: Path, image_dir: Path) -> int:
     for i, v in enumerate(variations):
         slug = v["metric"].lower().replace(" ", "-").replace("/", "-")
         video_file = video_dir / f"{i:02d}-{slug}.mp4"
-        image_file = image_dir / f"{i:02d}-{slug}.png"
+        image_file = next(
+            (f for ext in IMAGE_EXTENSIONS if (f := image_dir / f"{i:02d}-{slug}{ext}").exists()),
+            None,
+        )
 
         caption = f"{v['hook']}\n\n{v.get('hook_sub', '')}\n\nDownload Seneca Chat - link in bio"
 
@@ -70,7 +78,7 @@ def load_posts(variations: list[dict], video_dir: Path, image_dir: Path) -> int:
             v["hook"],
             caption,
             str(video_file) if video_file.exists() else None,
-            str(image_file) if image_file.exists() else None,
+            str(image_file) if image_file else None,
         ))
         loaded += 1
 
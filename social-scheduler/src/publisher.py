@@ -1,5 +1,6 @@
 """Instagram + Facebook Graph API publishing."""
 
+import mimetypes
 import os
 import time
 import requests
@@ -177,7 +178,7 @@ def fb_publish_image(
         resp = requests.post(
             f"{BASE_URL}/{page_id}/photos",
             data=params,
-            files={"source": (Path(image_path).name, f, "image/png")},
+            files={"source": (Path(image_path).name, f, mimetypes.guess_type(image_path)[0] or "image/png")},
             timeout=120,
         )
     resp.raise_for_status()
@@ -13,6 +13,10 @@ Environment variables required:
   TWITTER_API_SECRET            Twitter/X API secret
   TWITTER_ACCESS_TOKEN          Twitter/X access token
   TWITTER_ACCESS_TOKEN_SECRET   Twitter/X access token secret
+
+Optional:
+  LLM_CACHE=sqlite              Response cache: sqlite (data/llm_cache.sqlite3), postgres or off
+  LLM_CACHE_BYPASS=false        'true' always asks the API (fresh answers are still cached)
 """
 import sys
 from pathlib import Path
@@ -21,18 +25,30 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-sys.path.insert(0, str(Path(__file__).parent))
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+# The LLM response cache is shared with podcast-to-social
+PODCAST_DIR = BASE.parent / "podcast-to-social"
+sys.path.insert(0, str(PODCAST_DIR / "src"))
+
+from llm_cache import LLMCache
 
 from src import database as db
 from src import generator
 from src import poster
 
+CACHE_FILE = BASE / "data" / "llm_cache.sqlite3"
+
 
 def run(dry_run: bool = False):
     db.init_db()
 
     recent_combos = db.get_recent_combos(limit=30)
-    result = generator.generate(recent_combos)
+    cache = LLMCache.from_env(CACHE_FILE, cursor=db.cursor)
+    result = generator.generate(recent_combos, cache=cache)
+    if cache.used:
+        print(cache.summary())
 
     tweet_text = result["tweet_text"]
     reply_text = result["reply_text"]
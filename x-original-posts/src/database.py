@@ -6,6 +6,7 @@ Connection is configured via DATABASE_URL environment variable.
 """
 import os
 import json
+from contextlib import contextmanager
 from datetime import datetime
 
 import psycopg2
@@ -16,6 +17,18 @@ def get_connection():
     return psycopg2.connect(os.environ["DATABASE_URL"])
 
 
+@contextmanager
+def cursor():
+    """A cursor on a fresh connection, committed on success."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                yield cur
+    finally:
+        conn.close()
+
+
 def init_db():
     conn = get_connection()
     try:
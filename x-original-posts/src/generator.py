@@ -9,6 +9,7 @@ import os
 import random
 from pathlib import Path
 
+import httpx
 from openai import OpenAI
 
 BASE = Path(__file__).parent.parent
@@ -17,6 +18,25 @@ ANGLES_FILE  = BASE / "config" / "angles.json"
 PROMPT_FILE  = BASE / "prompts" / "tweet.md"
 PERSONA_FILE = BASE / "persona.md"
 
+_client = None
+
+
+def _get_client() -> OpenAI:
+    """Created once per process and reused, keeping its connection warm."""
+    global _client
+    if _client is None:
+        timeout = httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT", "60")), connect=10.0)
+        _client = OpenAI(
+            api_key=os.environ["OPENAI_API_KEY"],
+            max_retries=3,
+            timeout=timeout,
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=60),
+                timeout=timeout,
+            ),
+        )
+    return _client
+
 
 def _load_json(path: Path) -> list[dict]:
     with open(path) as f:
@@ -73,10 +93,13 @@ def _build_recent_themes_text(recent_combos: list[tuple[str, str]]) -> str:
     return "\n".join(lines)
 
 
-def generate(recent_combos: list[tuple[str, str]]) -> dict:
+def generate(recent_combos: list[tuple[str, str]], cache=None) -> dict:
     """
     Generate one tweet (and optional reply).
     Returns dict with keys: topic, angle, tweet_text, reply_text (may be None).
+
+    `cache` is an optional llm_cache.LLMCache; an identical prompt is then
+    answered from it instead of the API.
     """
     pillar, angle = pick_combo(recent_combos)
 
@@ -94,15 +117,24 @@ def generate(recent_combos: list[tuple[str, str]]) -> dict:
         .replace("{{persona}}", persona)
     )
 
-    client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    response = client.chat.completions.create(
-        model=os.environ.get("OPENAI_MODEL", "gpt-4o"),
-        max_tokens=1024,
-        messages=[{"role": "user", "content": prompt}],
-        response_format={"type": "json_object"},
-    )
-
-    data = json.loads(response.choices[0].message.content)
+    model = os.environ.get("OPENAI_MODEL", "gpt-4o")
+    max_tokens = 1024
+    response_format = {"type": "json_object"}
+    key = cache.key(model, max_tokens, response_format, prompt) if cache else None
+    content = cache.get(key) if cache else None
+
+    if content is None:
+        response = _get_client().chat.completions.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            response_format=response_format,
+        )
+        content = response.choices[0].message.content
+        if cache and response.choices[0].finish_reason == "stop":
+            cache.put(key, content)
+
+    data = json.loads(content)
 
     return {
         "topic":      pillar["id"],